@@ -1,185 +1,57 @@
 # app.py
 
+import os
+import time
+
 import streamlit as st
 import pandas as pd
-from collections import defaultdict
-import numpy_financial as npf
 import numpy as np
-
-# --- MOTEUR DE CALCUL DU PRÊT (INCHANGÉ) ---
-def generer_tableau_amortissement(montant_pret, taux_annuel_pc, duree_annees):
-    if not (montant_pret > 0 and taux_annuel_pc > 0 and duree_annees > 0): return {}
-    taux_mensuel = (taux_annuel_pc / 100) / 12
-    nb_mois = int(duree_annees * 12)
-    try: mensualite = npf.pmt(taux_mensuel, nb_mois, -montant_pret)
-    except ZeroDivisionError: return {}
-    tableau_annuel = defaultdict(lambda: {'interet': 0, 'principal': 0, 'crd_fin_annee': 0})
-    capital_restant_du = montant_pret
-    for mois in range(1, nb_mois + 1):
-        annee = (mois - 1) // 12 + 1
-        interet_mois = capital_restant_du * taux_mensuel
-        principal_mois = mensualite - interet_mois
-        capital_restant_du -= principal_mois
-        tableau_annuel[annee]['interet'] += interet_mois; tableau_annuel[annee]['principal'] += principal_mois
-        tableau_annuel[annee]['crd_fin_annee'] = capital_restant_du if capital_restant_du > 0.01 else 0
-    return dict(tableau_annuel)
-
-# --- MOTEUR DE CALCUL IMPÔT PLUS-VALUE (INCHANGÉ) ---
-def calculer_impot_plus_value(plus_value_brute, duree_detention):
-    if plus_value_brute <= 0: return 0, 0, 0, 0
-    abattement_ir = 0
-    if duree_detention > 5:
-        abattement_ir += sum(0.06 for _ in range(6, min(duree_detention, 21) + 1))
-        if duree_detention >= 22: abattement_ir += 0.04
-    base_imposable_ir = plus_value_brute * (1 - abattement_ir)
-    impot_sur_revenu_pv = base_imposable_ir * 0.19
-    abattement_ps = 0
-    if duree_detention > 5:
-        abattement_ps += sum(0.0165 for _ in range(6, min(duree_detention, 21) + 1))
-        if duree_detention == 22: abattement_ps += 0.0160
-        if duree_detention > 22: abattement_ps += sum(0.09 for _ in range(23, min(duree_detention, 30) + 1))
-    base_imposable_ps = plus_value_brute * (1 - abattement_ps)
-    prelevements_sociaux_pv = base_imposable_ps * 0.172
-    impot_total_pv = max(0, impot_sur_revenu_pv) + max(0, prelevements_sociaux_pv)
-    return impot_total_pv, plus_value_brute, base_imposable_ir, base_imposable_ps
-
-
-# --- MOTEUR DE SIMULATION LMNP (INCHANGÉ) ---
-def generer_projection_lmnp(params):
-    try: valeurs_num = {k: float(v) for k, v in params.items()}
-    except (ValueError, TypeError): return [{"erreur": "Veuillez entrer des nombres valides."}]
-
-    # Initialisation
-    prix_achat, cout_travaux, frais_notaire = valeurs_num.get("prix_achat", 0), valeurs_num.get("cout_travaux", 0), valeurs_num.get("frais_notaire", 0)
-    apport, frais_dossier = valeurs_num.get("apport_personnel", 0), valeurs_num.get("frais_dossier", 0)
-    montant_pret = prix_achat + cout_travaux + frais_notaire - apport
-    cout_acquisition = prix_achat + cout_travaux
-    base_acquisition_pv = prix_achat + cout_travaux + frais_notaire
-    investissement_initial_personnel = apport + frais_dossier # Frais de notaire sont dans le prêt
-    duree_pret = int(valeurs_num.get("duree_pret", 0))
-
-    tableau_amortissement_pret = generer_tableau_amortissement(montant_pret, valeurs_num.get("taux_interet_pret", 0), duree_pret)
-    mensualite_assurance_base = (montant_pret * (valeurs_num.get("taux_assurance_pret", 0) / 100)) / 12
-
-    loyer_mensuel_base, charges_copro_base, taxe_fonciere_base = valeurs_num.get("loyer_mensuel", 0), valeurs_num.get("charges_copro", 0), valeurs_num.get("taxe_fonciere", 0)
-    inflation_pc, revalo_bien_pc = valeurs_num.get("inflation_pc", 0) / 100, valeurs_num.get("revalo_bien_pc", 0) / 100
-    tmi_pc, prelevements_sociaux_pc = valeurs_num.get("tmi_pc", 0) / 100, 0.172 # PS sur revenus locatifs sont fixes
-    
-    cashflow_investisseur_accumule, amortissement_cumule, deficit_reportable = 0, 0, 0
-    tresorerie_sarl_cumulee = 0
-    abondement_cumule = 0
-    flux_tresorerie_tri_annuels = []
-    projection = []
-
-    for annee in range(1, duree_pret + 1):
-        facteur_inflation = (1 + inflation_pc)**(annee - 1)
-        loyer_annuel = (loyer_mensuel_base * 12) * facteur_inflation
-        charges_copro_annuelles = (charges_copro_base * 12) * facteur_inflation
-        taxe_fonciere_actuelle = taxe_fonciere_base * facteur_inflation
-        frais_gestion_annuels = loyer_annuel * (valeurs_num.get("frais_gestion_pc", 0) / 100)
-        gli_annuelle = (loyer_annuel + charges_copro_annuelles) * (valeurs_num.get("taux_gli_pc", 0) / 100)
-        
-        charges_annuelles_cash = (charges_copro_annuelles + taxe_fonciere_actuelle +
-            valeurs_num.get("assurance_pno", 0) + frais_gestion_annuels + gli_annuelle +
-            (valeurs_num.get("cfe", 0) * facteur_inflation))
-        if annee == 1: charges_annuelles_cash += frais_dossier
-
-        interets_annuels = tableau_amortissement_pret.get(annee, {}).get('interet', 0)
-        assurance_annuelle = mensualite_assurance_base * 12
-        
-        charges_annuelles_deductibles = charges_annuelles_cash + interets_annuels + assurance_annuelle
-        
-        amort_immo = (prix_achat + frais_notaire) * 0.85 / valeurs_num.get("duree_amort_immo", 1) if annee <= valeurs_num.get("duree_amort_immo", 0) else 0
-        amort_travaux = cout_travaux / 10 if annee <= 10 else 0
-        amort_meubles = valeurs_num.get("valeur_meubles", 0) / valeurs_num.get("duree_amort_meubles", 1) if annee <= valeurs_num.get("duree_amort_meubles", 0) else 0
-        amortissement_annuel = amort_immo + amort_travaux + amort_meubles
-        amortissement_cumule += amortissement_annuel
-
-        resultat_fiscal_avant_deficit = loyer_annuel - charges_annuelles_deductibles - amortissement_annuel
-        benefice_imposable = max(0, resultat_fiscal_avant_deficit - deficit_reportable)
-        deficit_genere = abs(min(0, resultat_fiscal_avant_deficit)); deficit_consomme = min(deficit_reportable, max(0, resultat_fiscal_avant_deficit))
-        deficit_reportable = (deficit_reportable - deficit_consomme) + deficit_genere
-        impot_total_annuel = benefice_imposable * (tmi_pc + prelevements_sociaux_pc)
-        
-        principal_annuel = tableau_amortissement_pret.get(annee, {}).get('principal', 0)
-        mensualite_credit_annuelle = interets_annuels + principal_annuel + assurance_annuelle
-        cashflow_sarl_avant_operations = loyer_annuel - charges_annuelles_cash - mensualite_credit_annuelle
-        
-        tresorerie_avant_distribution = tresorerie_sarl_cumulee + cashflow_sarl_avant_operations
-        
-        abondement = 0
-        if tresorerie_avant_distribution < 0:
-            abondement = abs(tresorerie_avant_distribution)
-            abondement_cumule += abondement
-            tresorerie_sarl_cumulee = 0
-        else:
-            tresorerie_sarl_cumulee = tresorerie_avant_distribution
-            
-        taux_distrib = valeurs_num.get("taux_distrib_pc", 100) / 100
-        dividendes_disponibles = max(0, resultat_fiscal_avant_deficit)
-        dividendes_verses = min(dividendes_disponibles, tresorerie_sarl_cumulee) * taux_distrib
-        
-        tresorerie_sarl_cumulee -= dividendes_verses
-        
-        cashflow_net_investisseur_annuel = dividendes_verses - impot_total_annuel - abondement
-        cashflow_investisseur_accumule += cashflow_net_investisseur_annuel
-        flux_tresorerie_tri_annuels.append(cashflow_net_investisseur_annuel)
-
-        prix_revente = cout_acquisition * (1 + revalo_bien_pc)**annee
-        valeur_nette_comptable = base_acquisition_pv - amortissement_cumule
-        plus_value_brute = prix_revente - base_acquisition_pv
-        
-        impot_sur_pv, _, _, _ = calculer_impot_plus_value(plus_value_brute, annee)
-
-        crd = tableau_amortissement_pret.get(annee, {}).get('crd_fin_annee', 0)
-        
-        cash_net_apres_revente = prix_revente - crd - impot_sur_pv
-        cash_net_final_investisseur = cash_net_apres_revente + tresorerie_sarl_cumulee
-        
-        total_cash_investi = investissement_initial_personnel + abondement_cumule
-        total_cash_recu = cashflow_investisseur_accumule - cashflow_net_investisseur_annuel + cash_net_final_investisseur
-        benefice_net_total = total_cash_recu - total_cash_investi
-        
-        cash_flows_annuel = [-investissement_initial_personnel] + flux_tresorerie_tri_annuels[:]
-        cash_flows_annuel[-1] += cash_net_final_investisseur
-        try: 
-            tri = npf.irr(cash_flows_annuel)
-            tri_pc = tri * 100 if not np.isnan(tri) else 0
-        except: 
-            tri_pc = 0
-
-        projection.append({ "Année": annee, "Loyers Annuels": loyer_annuel, "Résultat Fiscal": resultat_fiscal_avant_deficit, "Dividendes Disponibles": dividendes_disponibles, "Impôt (IR+PS)": impot_total_annuel, "Cash-flow Net": cashflow_net_investisseur_annuel, "Tréso. SARL": tresorerie_sarl_cumulee, "PV Brute": plus_value_brute, "Impôt sur PV": impot_sur_pv, "Bénéfice Net Total": benefice_net_total, "TRI (%)": tri_pc })
-
-    # Section post-crédit
-    projection_post_credit = {}
-    if duree_pret > 0 and len(projection) > 0:
-        annee_post_credit = duree_pret + 1; facteur_inflation = (1 + inflation_pc)**(annee_post_credit - 1)
-        loyer_annuel = (loyer_mensuel_base * 12) * facteur_inflation; charges_copro_annuelles = (charges_copro_base * 12) * facteur_inflation
-        taxe_fonciere_actuelle = taxe_fonciere_base * facteur_inflation
-        frais_gestion_annuels = loyer_annuel * (valeurs_num.get("frais_gestion_pc", 0) / 100); gli_annuelle = (loyer_annuel + charges_copro_annuelles) * (valeurs_num.get("taux_gli_pc", 0) / 100)
-        charges_annuelles_cash = (charges_copro_annuelles + taxe_fonciere_actuelle + valeurs_num.get("assurance_pno", 0) + frais_gestion_annuels + gli_annuelle + (valeurs_num.get("cfe", 0) * facteur_inflation))
-        
-        amort_immo = (prix_achat + frais_notaire) * 0.85 / valeurs_num.get("duree_amort_immo", 1) if annee_post_credit <= valeurs_num.get("duree_amort_immo", 0) else 0
-        amort_travaux = cout_travaux / 10 if annee_post_credit <= 10 else 0
-        amort_meubles = valeurs_num.get("valeur_meubles", 0) / valeurs_num.get("duree_amort_meubles", 1) if annee_post_credit <= valeurs_num.get("duree_amort_meubles", 0) else 0
-        amortissement_annuel = amort_immo + amort_travaux + amort_meubles
-        resultat_fiscal = loyer_annuel - charges_annuelles_cash - amortissement_annuel
-        
-        benefice_imposable = max(0, resultat_fiscal - deficit_reportable); impot_total_annuel = benefice_imposable * (tmi_pc + prelevements_sociaux_pc)
-        cashflow_sarl_post_credit = loyer_annuel - charges_annuelles_cash
-        
-        tresorerie_post_credit = tresorerie_sarl_cumulee + cashflow_sarl_post_credit
-        
-        taux_distrib = valeurs_num.get("taux_distrib_pc", 100) / 100
-        dividendes_disponibles = max(0, resultat_fiscal)
-        dividendes_verses = min(dividendes_disponibles, tresorerie_post_credit) * taux_distrib
-        
-        cashflow_net_investisseur_annuel = dividendes_verses - impot_total_annuel
-        tresorerie_post_credit -= dividendes_verses
-        
-        projection_post_credit = {"Année": f"An {annee_post_credit}", "Loyers Annuels": loyer_annuel, "Résultat Fiscal": resultat_fiscal, "Dividendes Disponibles": dividendes_disponibles, "Impôt (IR+PS)": impot_total_annuel, "Cash-flow Net": cashflow_net_investisseur_annuel, "Tréso. SARL": tresorerie_post_credit, "PV Brute": "N/A", "Impôt sur PV": "N/A", "Bénéfice Net Total": "N/A", "TRI (%)": "N/A"}
-
-    return projection, projection_post_credit
+import altair as alt
+
+from moteur.cache import CacheResultats
+from moteur.chrono import Releve, activer, etape
+from moteur.objectifs import LIBELLES_STATUT_OBJECTIF, Objectif, SolveurObjectifs
+from moteur.monte_carlo import COLONNES_MONTE_CARLO, HypothesesStochastiques, cle_hypotheses, simuler_monte_carlo
+from moteur.portefeuille import PARAMETRES_LOT, Portefeuille
+from moteur.projection import generer_projection_lmnp_lot
+from moteur.sensibilite import TAILLE_BLOC_GRILLE, TAILLE_MAX_GRILLE, carte_sensibilite, tornade
+from moteur.sortie import HORIZON_SORTIE, analyser_sortie
+from moteur.tri import TRI_AUCUN, TRI_MULTIPLE, TRI_NON_CONVERGE
+
+# --- CACHE DES RÉSULTATS (partagé entre sessions, base SQLite si IMMOIR_CACHE_SQLITE est défini) ---
+@st.cache_resource
+def cache_resultats():
+    return CacheResultats(chemin_sqlite=os.environ.get("IMMOIR_CACHE_SQLITE"))
+
+# Solveur d'objectifs : garde les dernières solutions comme points de départ
+@st.cache_resource
+def solveur_objectifs():
+    return SolveurObjectifs()
+
+
+# --- GRAPHIQUES DE SENSIBILITÉ ---
+alt.data_transformers.disable_max_rows()  # cartes jusqu'à 200 × 200 points
+
+def graphique_carte(grille, variable_x, valeurs_x, variable_y, valeurs_y, indicateur):
+    donnees = pd.DataFrame({"x": np.tile(valeurs_x, len(valeurs_y)), "y": np.repeat(valeurs_y, len(valeurs_x)), "valeur": grille.ravel()})
+    return alt.Chart(donnees).mark_rect().encode(
+        x=alt.X("x:O", title=variable_x, axis=alt.Axis(format=",.4~f", labelOverlap=True)),
+        y=alt.Y("y:O", title=variable_y, sort="descending", axis=alt.Axis(format=",.4~f", labelOverlap=True)),
+        color=alt.Color("valeur:Q", title=indicateur, scale=alt.Scale(scheme="redyellowgreen")),
+        tooltip=[alt.Tooltip("x:Q", title=variable_x), alt.Tooltip("y:Q", title=variable_y), alt.Tooltip("valeur:Q", title=indicateur, format=",.2f")],
+    )
+
+
+def graphique_tornade(resultat, indicateur):
+    donnees = pd.DataFrame({"variable": resultat.variables, "bas": resultat.indicateur_bas, "haut": resultat.indicateur_haut,
+                            "valeur basse": resultat.valeurs_basses, "valeur haute": resultat.valeurs_hautes})
+    barres = alt.Chart(donnees).mark_bar().encode(
+        y=alt.Y("variable:N", sort=list(resultat.variables), title=None), x=alt.X("bas:Q", title=indicateur), x2="haut:Q",
+        color=alt.condition("datum.haut >= datum.bas", alt.value("#4c9a2a"), alt.value("#c0392b")),
+        tooltip=["variable", alt.Tooltip("valeur basse:Q", format=",.2f"), alt.Tooltip("bas:Q", format=",.2f"),
+                 alt.Tooltip("valeur haute:Q", format=",.2f"), alt.Tooltip("haut:Q", format=",.2f")],
+    )
+    return barres + alt.Chart(pd.DataFrame({"reference": [resultat.reference]})).mark_rule(color="black").encode(x="reference:Q")
 
 
 # --- INTERFACE GRAPHIQUE STREAMLIT ---
@@ -228,6 +100,13 @@ with st.sidebar:
         params["assurance_pno"] = st.number_input("Assurance PNO annuelle (€)", min_value=0.0, value=champs["hypotheses"]["assurance_pno"], step=5.0, format="%.2f")
         params["cfe"] = st.number_input("Cotisation Foncière des Entreprises (CFE) (€)", min_value=0.0, value=champs["hypotheses"]["cfe"], step=10.0, format="%.2f")
 
+    mode_debug = st.checkbox("🐞 Afficher les temps de calcul", value=False)
+
+# Relevé des temps par étape du moteur pour cette exécution (mode debug)
+releve = Releve() if mode_debug else None
+activer(releve)
+debut_execution = time.perf_counter()
+
 
 # --- Zone principale pour les titres et les résultats ---
 st.title("📈 Simulateur d'Investissement en SARL de Famille (IR)")
@@ -236,11 +115,12 @@ st.divider()
 
 st.header("📊 Projection Financière Annuelle")
 
-projection_data, projection_post_credit = generer_projection_lmnp(params)
+cache = cache_resultats()
+try: projection_lot = cache.obtenir("projection", params, lambda: generer_projection_lmnp_lot({k: [v] for k, v in params.items()}, cache=cache))
+except ValueError as erreur: projection_lot = None; st.error(str(erreur))
 
-if "erreur" in projection_data:
-    st.error(projection_data["erreur"])
-else:
+if projection_lot is not None:
+    projection_data, projection_post_credit = projection_lot.scenario(0)
     df = pd.DataFrame(projection_data)
     
     # Formatage du DataFrame pour affichage
@@ -251,9 +131,16 @@ else:
         'TRI (%)': '{:.1f}%'
     }
     
-    df_styled = df.style.format(format_dict)
-    
-    st.dataframe(df_styled, use_container_width=True)
+    with etape("affichage.tableau"):
+        df_styled = df.style.format(format_dict, na_rep="n/d")
+        st.dataframe(df_styled, use_container_width=True)
+
+    # Années où le TRI n'existe pas ou n'est pas unique
+    statuts_tri = projection_lot.statut_tri[0, :len(projection_data)]
+    for statut, message in ((TRI_AUCUN, "aucun taux n'annule la VAN des flux (TRI n/d)"), (TRI_MULTIPLE, "plusieurs taux annulent la VAN des flux, le TRI affiché est le plus proche de 0"),
+                            (TRI_NON_CONVERGE, "le calcul du TRI n'a pas convergé (TRI n/d)")):
+        annees = [str(annee + 1) for annee in np.flatnonzero(statuts_tri == statut)]
+        if annees: st.warning(f"Année(s) {', '.join(annees)} : {message}.")
 
     if projection_post_credit:
         st.subheader(f"🗓️ Situation après la fin du crédit (An {params['duree_pret'] + 1})")
@@ -266,6 +153,139 @@ else:
         col4.metric("Cash-flow Net Investisseur", f"{projection_post_credit['Cash-flow Net']:,.0f} €")
 
 
+    # --- Année de revente optimale ---
+    st.divider()
+    st.header("🚪 Année de revente optimale")
+    st.write("Prolonge la projection au-delà du crédit et compare toutes les années de revente possibles. La plus-value est exonérée d'IR après 22 ans de détention et de prélèvements sociaux après 30 ans.")
+    horizon = st.number_input("Horizon de détention analysé (ans)", min_value=int(params["duree_pret"]), max_value=50, value=max(HORIZON_SORTIE, int(params["duree_pret"])), step=1)
+    analyse = cache.obtenir("sortie", {**params, "horizon": horizon}, lambda: analyser_sortie({k: [v] for k, v in params.items()}, horizon=int(horizon), cache=cache))
+
+    col1, col2 = st.columns(2)
+    col1.metric("Meilleur TRI", f"{analyse.tri_max[0]:.1f}%" if analyse.annee_tri_max[0] else "n/d")
+    col1.caption(f"Revente à l'an {analyse.annee_tri_max[0]}" if analyse.annee_tri_max[0] else "Aucune année avec un TRI unique.")
+    col2.metric("Meilleur bénéfice net total", f"{analyse.benefice_max[0]:,.0f} €")
+    col2.caption(f"Revente à l'an {analyse.annee_benefice_max[0]}")
+    courbes = pd.DataFrame({colonne: analyse.lot.colonnes[colonne][0] for colonne in ("TRI (%)", "Bénéfice Net Total")}, index=pd.Index(analyse.annees, name="Année de revente"))
+    col1.line_chart(courbes["TRI (%)"])
+    col2.line_chart(courbes["Bénéfice Net Total"])
+
+
+    # --- Recherche d'objectifs ---
+    st.divider()
+    st.header("🎯 Recherche d'objectifs")
+    st.write("Calcule directement la valeur d'un paramètre qui atteint une cible, tous les autres paramètres restant ceux saisis.")
+    cible_tri = st.number_input("TRI visé à la fin du prêt (%)", min_value=-50.0, max_value=50.0, value=6.0, step=0.5, format="%.2f")
+    cout_total = params["prix_achat"] + params["cout_travaux"] + params["frais_notaire"] + params["frais_dossier"]
+    objectifs = {
+        f"Prix d'achat maximal pour un TRI ≥ {cible_tri:.2f} %": Objectif("prix_achat", "TRI (%)", cible_tri, "max"),
+        "Apport minimal pour un cash-flow ≥ 0 chaque année": Objectif("apport_personnel", "Cash-flow Min", 0.0, "min", borne_max=cout_total),
+        "Loyer mensuel d'équilibre (cash-flow ≥ 0 chaque année)": Objectif("loyer_mensuel", "Cash-flow Min", 0.0, "min"),
+    }
+    choix = st.multiselect("Objectifs à résoudre", list(objectifs), default=list(objectifs))
+    if choix:
+        resultats_objectifs = cache.obtenir("objectifs", {**params, "cible_tri": cible_tri, "objectifs": "|".join(choix)},
+                                            lambda: solveur_objectifs().resoudre(params, [objectifs[libelle] for libelle in choix]))
+        st.dataframe(pd.DataFrame({
+            "Objectif": choix,
+            "Valeur trouvée": [f"{r.valeur:,.2f} €" if not np.isnan(r.valeur) else "n/d" for r in resultats_objectifs],
+            "Indicateur obtenu": [f"{objectifs[libelle].indicateur} : {r.valeur_indicateur:,.2f}" if not np.isnan(r.valeur_indicateur) else "n/d"
+                                  for libelle, r in zip(choix, resultats_objectifs)],
+            "Statut": [LIBELLES_STATUT_OBJECTIF[r.statut] for r in resultats_objectifs],
+        }), use_container_width=True, hide_index=True)
+
+
+    # --- Sensibilité ---
+    st.divider()
+    st.header("🔥 Sensibilité")
+    st.write("Balaye deux paramètres sur une grille et affiche l'indicateur choisi pour chaque combinaison ; la tornade fait varier chaque paramètre seul.")
+    col1, col2, col3 = st.columns(3)
+    noms_parametres = list(params)
+    indicateur_sensibilite = col3.selectbox("Indicateur", ["TRI (%)", "Bénéfice Net Total"])
+    annee_sensibilite = col3.number_input("Année de revente", min_value=1, max_value=50, value=int(params["duree_pret"]), step=1)
+    resolution = col3.slider("Points par paramètre", min_value=10, max_value=TAILLE_MAX_GRILLE, value=50, step=10)
+    bornes = {}
+    for colonne, axe, defaut in ((col1, "abscisse", "taux_interet_pret"), (col2, "ordonnée", "prix_achat")):
+        # Le paramètre de l'abscisse n'est pas proposé en ordonnée
+        choix = [nom for nom in noms_parametres if nom not in {choisi for choisi, *_ in bornes.values()}]
+        variable = colonne.selectbox(f"Paramètre en {axe}", choix, index=choix.index(defaut) if defaut in choix else 0)
+        valeur = float(params[variable])
+        bornes[axe] = (variable, colonne.number_input(f"{variable} minimum", value=0.5 * valeur, key=f"sensibilite_{axe}_{variable}_min"),
+                       colonne.number_input(f"{variable} maximum", value=max(1.5 * valeur, valeur + 1), key=f"sensibilite_{axe}_{variable}_max"))
+    (variable_x, min_x, max_x), (variable_y, min_y, max_y) = bornes["abscisse"], bornes["ordonnée"]
+
+    if st.checkbox("Afficher la carte de sensibilité"):
+        valeurs_x, valeurs_y = np.linspace(min_x, max_x, resolution), np.linspace(min_y, max_y, resolution)
+        zone_carte, progression = st.empty(), st.progress(0.0)
+        def calculer_carte():
+            # Affichage après chaque bloc : une dizaine de mises à jour au plus
+            taille_bloc = max(TAILLE_BLOC_GRILLE, resolution * resolution // 10)
+            for part, grille in carte_sensibilite(params, variable_x, valeurs_x, variable_y, valeurs_y, indicateur_sensibilite, annee_sensibilite, taille_bloc):
+                zone_carte.altair_chart(graphique_carte(grille, variable_x, valeurs_x, variable_y, valeurs_y, indicateur_sensibilite), use_container_width=True)
+                progression.progress(part)
+            return grille
+        cle_carte = {**params, "variable_x": variable_x, "valeurs_x": valeurs_x, "variable_y": variable_y, "valeurs_y": valeurs_y,
+                     "indicateur": indicateur_sensibilite, "annee": annee_sensibilite}
+        try:
+            grille = cache.obtenir("sensibilite", cle_carte, calculer_carte)
+            zone_carte.altair_chart(graphique_carte(grille, variable_x, valeurs_x, variable_y, valeurs_y, indicateur_sensibilite), use_container_width=True)
+        except ValueError as erreur: st.error(str(erreur))
+        progression.empty()
+
+    variation = st.slider("Variation de chaque paramètre pour la tornade (± %)", min_value=1, max_value=50, value=10)
+    resultat_tornade = cache.obtenir("sensibilite", {**params, "tornade": variation, "indicateur": indicateur_sensibilite, "annee": annee_sensibilite},
+                                     lambda: tornade(params, indicateur_sensibilite, annee_sensibilite, variation))
+    st.altair_chart(graphique_tornade(resultat_tornade, indicateur_sensibilite), use_container_width=True)
+    st.caption(f"Trait noir : valeur avec les paramètres saisis ({resultat_tornade.reference:,.2f}). Vert : l'indicateur augmente avec le paramètre.")
+
+
+    # --- Portefeuille de lots ---
+    st.divider()
+    st.header("🏢 Portefeuille de lots")
+    st.write("Simule plusieurs lots détenus par la même SARL (trésorerie, déficit reportable et distribution communs). "
+             "Fichier CSV : une ligne par lot ; les colonnes absentes reprennent les valeurs saisies, `annee_acquisition` vaut 1 par défaut.")
+    fichier_lots = st.file_uploader("Lots du portefeuille (CSV)", type="csv")
+    if fichier_lots is not None:
+        horizon_portefeuille = st.number_input("Horizon de la projection (ans)", min_value=1, max_value=60, value=max(HORIZON_SORTIE, int(params["duree_pret"])), step=1)
+        lots = pd.read_csv(fichier_lots)
+        for cle in PARAMETRES_LOT:
+            if cle not in lots.columns and cle in params: lots[cle] = params[cle]
+        portefeuille = Portefeuille(horizon_portefeuille, params["inflation_pc"], params["tmi_pc"], params["taux_distrib_pc"])
+        try:
+            portefeuille.ajouter(lots[[cle for cle in PARAMETRES_LOT if cle in lots.columns]])
+            projection_portefeuille = portefeuille.projeter()
+            st.metric("Lots", f"{len(portefeuille):,}")
+            st.dataframe(pd.DataFrame(projection_portefeuille.lignes()).style.format(format_dict, na_rep="n/d"), use_container_width=True)
+        except ValueError as erreur: st.error(str(erreur))
+
+
+    # --- Simulation Monte Carlo ---
+    st.divider()
+    st.header("🎲 Simulation Monte Carlo")
+    st.write("Tire des trajectoires aléatoires d'inflation, de revalorisation du bien, de vacance locative et de révision du taux autour des hypothèses saisies.")
+    with st.expander("Hypothèses stochastiques", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        nb_trajectoires = col1.number_input("Nombre de trajectoires", min_value=100, max_value=100000, value=10000, step=1000)
+        ecart_type_inflation = col1.number_input("Écart-type de l'inflation (pts)", min_value=0.0, max_value=10.0, value=1.0, step=0.1, format="%.2f")
+        ecart_type_revalo = col2.number_input("Écart-type de la revalorisation (pts)", min_value=0.0, max_value=20.0, value=3.0, step=0.5, format="%.2f")
+        mois_vacance = col2.number_input("Vacance moyenne (mois par an)", min_value=0.0, max_value=12.0, value=0.5, step=0.1, format="%.2f")
+        periodicite_revision = col3.number_input("Révision du taux tous les (ans, 0 = taux fixe)", min_value=0, max_value=30, value=0, step=1)
+        ecart_type_taux = col3.number_input("Écart-type à chaque révision (pts)", min_value=0.0, max_value=5.0, value=0.75, step=0.05, format="%.2f")
+
+    if st.checkbox("Lancer la simulation Monte Carlo"):
+        hypotheses = HypothesesStochastiques(ecart_type_inflation_pc=ecart_type_inflation, ecart_type_revalo_pc=ecart_type_revalo, mois_vacance_moyens=mois_vacance,
+                                             periodicite_revision_ans=int(periodicite_revision), ecart_type_revision_taux_pc=ecart_type_taux)
+        cle_monte_carlo = {**params, **cle_hypotheses(hypotheses), "nb_trajectoires": nb_trajectoires}
+        resultat_mc = cache.obtenir("monte_carlo", cle_monte_carlo, lambda: simuler_monte_carlo(params, int(nb_trajectoires), hypotheses, graine=0))
+
+        col1, col2 = st.columns(2)
+        col1.metric("Probabilité d'abondement des associés", f"{resultat_mc.probabilite_abondement:.1%}")
+        col2.metric("Trajectoires simulées", f"{resultat_mc.nb_trajectoires:,}")
+        for colonne in COLONNES_MONTE_CARLO:
+            st.subheader(f"{colonne} : bandes P5 / P50 / P95")
+            st.line_chart(pd.DataFrame(resultat_mc.bandes[colonne].T, index=pd.Index(resultat_mc.annees, name="Année"), columns=["P5", "P50", "P95"]))
+        if resultat_mc.part_sans_tri.any():
+            st.caption(f"Jusqu'à {resultat_mc.part_sans_tri.max():.1%} des trajectoires n'ont pas de TRI certaines années ; elles sont exclues des bandes de TRI.")
+
 # Explications des colonnes
 with st.expander("📘 Cliquez ici pour voir la description des colonnes du tableau"):
     descriptions_calcul = {
@@ -279,7 +299,19 @@ with st.expander("📘 Cliquez ici pour voir la description des colonnes du tabl
         "PV Brute": "Plus-Value Brute en cas de revente à l'année N : Prix de Vente - Prix d'Acquisition (hors frais).",
         "Impôt sur PV": "Impôt total (IR à 19% + PS à 17.2%) payé sur la plus-value, après abattements pour durée de détention.",
         "Bénéfice Net Total": "Enrichissement net final de l'investisseur en cas de vente. Total des flux (cash net de la revente + dividendes perçus) moins le total du capital investi (apport + abondements).",
-        "TRI (%)": "Taux de Rentabilité Interne. Le rendement annualisé de votre capital investi, tenant compte de tous les flux de trésorerie (investissement initial, cash-flows annuels, et revente). C'est un indicateur de performance clé."
+        "TRI (%)": "Taux de Rentabilité Interne. Le rendement annualisé de votre capital investi, tenant compte de tous les flux de trésorerie (investissement initial, cash-flows annuels, et revente). C'est un indicateur de performance clé. Affiché « n/d » lorsqu'aucun taux n'annule la valeur actuelle nette des flux."
     }
     for col, desc in descriptions_calcul.items():
         st.markdown(f"**{col}**: {desc}")
+
+# Compteurs du cache, après les calculs de cette exécution
+with st.sidebar.expander("🗄️ Cache des résultats", expanded=False):
+    st.dataframe(pd.DataFrame(cache_resultats().statistiques()).T, use_container_width=True)
+
+# Temps de calcul de cette exécution, par étape (mode debug)
+if releve is not None:
+    activer(None)
+    with st.sidebar.expander("🐞 Temps de calcul de cette exécution", expanded=True):
+        st.metric("Exécution complète", f"{(time.perf_counter() - debut_execution) * 1000:,.0f} ms")
+        if releve.etapes: st.dataframe(pd.DataFrame(releve.tableau()).style.format({"Total (ms)": "{:,.1f}", "Max (ms)": "{:,.1f}"}), use_container_width=True, hide_index=True)
+        st.caption("Temps inclusifs : une étape contient celles qu'elle appelle. Une étape absente a été servie par le cache.")
@@ -0,0 +1,14 @@
+# moteur/__init__.py
+# Moteurs de calcul du simulateur, sans dépendance à l'interface Streamlit.
+
+from moteur.fiscalite import ABATTEMENTS_IR, ABATTEMENTS_PS, abattements_plus_value, calculer_impot_plus_value, impot_plus_value
+from moteur.pret import Echeancier, calculer_echeanciers, generer_tableau_amortissement
+from moteur.projection import COLONNES_POST_CREDIT, COLONNES_PROJECTION, PARAMETRES_SIMULATION, ProjectionLot, generer_projection_lmnp, generer_projection_lmnp_lot, indicateurs_projection
+from moteur.tri import LIBELLES_STATUT_TRI, TRI_AUCUN, TRI_MULTIPLE, TRI_NON_CONVERGE, TRI_OK, ResultatTRI, tri_sortie_annuelle
+from moteur.cache import CacheLRU, CacheResultats, StockageSQLite, cle_parametres, normaliser_parametres
+from moteur.monte_carlo import COLONNES_MONTE_CARLO, HypothesesStochastiques, ResultatMonteCarlo, simuler_monte_carlo
+from moteur.sortie import HORIZON_SORTIE, AnalyseSortie, analyser_sortie
+from moteur.objectifs import LIBELLES_STATUT_OBJECTIF, Objectif, ResultatObjectif, SolveurObjectifs, resoudre_objectifs
+from moteur.sensibilite import Tornade, carte_sensibilite, evaluer_indicateur, tornade
+from moteur.portefeuille import FLUX_LOT, PARAMETRES_LOT, Portefeuille, ProjectionPortefeuille, flux_lots
+from moteur.chrono import Releve, activer, chronometre, etape
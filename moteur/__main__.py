@@ -0,0 +1,7 @@
+# moteur/__main__.py
+
+import sys
+
+from moteur.cli import main
+
+sys.exit(main())
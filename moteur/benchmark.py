@@ -0,0 +1,157 @@
+# moteur/benchmark.py
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from moteur.cache import VERSION_MOTEUR
+from moteur.chrono import Releve
+from moteur.fiscalite import calculer_impot_plus_value
+from moteur.pret import generer_tableau_amortissement
+from moteur.projection import generer_projection_lmnp, generer_projection_lmnp_lot
+
+# --- BANC D'ESSAI DES MOTEURS ---
+# Jeux de paramètres fixes (prêt court ou long, TMI élevée, SARL déficitaire) et
+# cas mesurés sur chacun : débit (unités par seconde, meilleure de plusieurs
+# répétitions), pic mémoire (tracemalloc, sur une exécution séparée) et temps
+# par étape du moteur. Les résultats peuvent être enregistrés comme référence
+# puis comparés aux exécutions suivantes :
+#
+#   python -m moteur.benchmark --enregistrer reference.json
+#   python -m moteur.benchmark --reference reference.json   # code 1 si régression
+
+PARAMETRES_REFERENCE = {"prix_achat": 120000.0, "cout_travaux": 0.0, "valeur_meubles": 10000.0, "loyer_mensuel": 900.0, "apport_personnel": 30000.0,
+                        "frais_notaire": 10000.0, "duree_pret": 25, "taux_interet_pret": 3.5, "taux_assurance_pret": 0.34, "frais_dossier": 0.0,
+                        "tmi_pc": 11.0, "duree_amort_immo": 30, "duree_amort_meubles": 7, "taux_distrib_pc": 100.0, "inflation_pc": 2.0,
+                        "revalo_bien_pc": 2.0, "charges_copro": 100.0, "taxe_fonciere": 500.0, "frais_gestion_pc": 6.0, "taux_gli_pc": 3.5,
+                        "assurance_pno": 120.0, "cfe": 150.0}
+JEUX_PARAMETRES = {
+    "reference": PARAMETRES_REFERENCE,
+    "pret_court": dict(PARAMETRES_REFERENCE, duree_pret=10, apport_personnel=60000.0, taux_interet_pret=3.0),
+    "pret_long": dict(PARAMETRES_REFERENCE, duree_pret=30, taux_interet_pret=4.2, apport_personnel=10000.0),
+    "tmi_elevee": dict(PARAMETRES_REFERENCE, tmi_pc=45.0, loyer_mensuel=1100.0, duree_amort_immo=20),
+    "deficitaire": dict(PARAMETRES_REFERENCE, prix_achat=250000.0, cout_travaux=60000.0, frais_notaire=20000.0, apport_personnel=10000.0, charges_copro=250.0),
+}
+CAS = ("tableau_amortissement", "impot_plus_value", "projection_scenario", "projection_lot", "rendu_tableau")
+TAILLE_LOT = 10000
+SEUIL_REGRESSION = 0.2
+
+
+def variantes(params, taille, graine=0):
+    """Lot de `taille` variantes autour de `params` (prix, loyer, apport, taux), reproductible."""
+    generateur = np.random.default_rng(graine)
+    lot = {cle: np.full(taille, float(valeur)) for cle, valeur in params.items()}
+    lot["prix_achat"] *= generateur.uniform(0.8, 1.2, taille)
+    lot["loyer_mensuel"] *= generateur.uniform(0.8, 1.2, taille)
+    lot["apport_personnel"] *= generateur.uniform(0.5, 1.5, taille)
+    lot["taux_interet_pret"] = np.maximum(lot["taux_interet_pret"] + generateur.uniform(-1, 1, taille), 0.1)
+    return lot
+
+
+def _preparer_cas(cas, params, taille_lot):
+    """(fonction sans argument, nombre d'unités traitées par appel) ; None si le cas n'est pas disponible."""
+    if cas == "tableau_amortissement":
+        montant = params["prix_achat"] + params["cout_travaux"] + params["frais_notaire"] - params["apport_personnel"]
+        return (lambda: [generer_tableau_amortissement(montant, params["taux_interet_pret"], params["duree_pret"]) for _ in range(100)]), 100
+    if cas == "impot_plus_value":
+        return (lambda: [calculer_impot_plus_value(50000.0 + duree, duree) for _ in range(100) for duree in range(36)]), 3600
+    if cas == "projection_scenario":
+        return (lambda: generer_projection_lmnp(params)), 1
+    if cas == "projection_lot":
+        lot = variantes(params, taille_lot)
+        return (lambda: generer_projection_lmnp_lot(lot)), taille_lot
+    if cas == "rendu_tableau":
+        try:
+            import pandas as pd
+            import jinja2  # noqa: F401  (requis par DataFrame.style)
+        except ImportError: return None
+        df = pd.DataFrame(generer_projection_lmnp(params)[0])
+        format_dict = {colonne: "{:,.0f} €" for colonne in df.columns if colonne not in ("Année", "TRI (%)")}
+        format_dict["TRI (%)"] = "{:.1f}%"
+        return (lambda: df.style.format(format_dict, na_rep="n/d").to_html()), 1
+    raise ValueError(f"Cas inconnu : {cas}")
+
+
+def mesurer(fonction, unites, repetitions=3):
+    """Débit (meilleure répétition), pic mémoire et temps par étape d'une fonction."""
+    fonction()  # échauffement
+    durees = []
+    for _ in range(repetitions):
+        with Releve() as releve:
+            debut = time.perf_counter()
+            fonction()
+            durees.append(time.perf_counter() - debut)
+    tracemalloc.start()
+    try:
+        fonction()
+        pic = tracemalloc.get_traced_memory()[1]
+    finally: tracemalloc.stop()
+    duree = min(durees)
+    return {"unites": unites, "duree_s": duree, "par_seconde": unites / duree if duree > 0 else float("inf"), "memoire_pic_mo": pic / 2**20,
+            "etapes_ms": {nom: total * 1000 / appels for nom, (appels, total, _) in releve.etapes.items()}}
+
+
+def executer_benchmarks(jeux=None, cas=CAS, taille_lot=TAILLE_LOT, repetitions=3, progression=None):
+    """Mesure chaque cas sur chaque jeu de paramètres ; résultats indexés par "jeu/cas"."""
+    resultats = {}
+    for nom_jeu in jeux or JEUX_PARAMETRES:
+        for nom_cas in cas:
+            prepare = _preparer_cas(nom_cas, JEUX_PARAMETRES[nom_jeu], taille_lot)
+            if prepare is None: continue
+            resultats[f"{nom_jeu}/{nom_cas}"] = mesurer(*prepare, repetitions=repetitions)
+            if progression is not None: progression(f"{nom_jeu}/{nom_cas}", resultats[f"{nom_jeu}/{nom_cas}"])
+    return {"version_moteur": VERSION_MOTEUR, "python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+            "taille_lot": taille_lot, "resultats": resultats}
+
+
+def comparer(releve, reference, seuil=SEUIL_REGRESSION):
+    """Écarts avec une référence : [(cas, débit relatif, mémoire relative, régression)]."""
+    ecarts = []
+    for cas, mesure in releve["resultats"].items():
+        if cas not in reference.get("resultats", {}): continue
+        ancien = reference["resultats"][cas]
+        debit = mesure["par_seconde"] / ancien["par_seconde"]
+        memoire = mesure["memoire_pic_mo"] / ancien["memoire_pic_mo"] if ancien["memoire_pic_mo"] > 0 else 1.0
+        ecarts.append((cas, debit, memoire, debit < 1 - seuil or memoire > 1 + seuil))
+    return ecarts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m moteur.benchmark", description="Banc d'essai des moteurs de simulation.")
+    parser.add_argument("--jeux", nargs="*", choices=list(JEUX_PARAMETRES), default=None, help="jeux de paramètres (défaut : tous)")
+    parser.add_argument("--cas", nargs="*", choices=CAS, default=list(CAS), help="cas mesurés (défaut : tous)")
+    parser.add_argument("--taille-lot", type=int, default=TAILLE_LOT, help=f"scénarios du cas projection_lot (défaut : {TAILLE_LOT})")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--enregistrer", metavar="FICHIER", help="enregistre les résultats (JSON) comme référence")
+    parser.add_argument("--reference", metavar="FICHIER", help="compare à une référence enregistrée ; code de sortie 1 si régression")
+    parser.add_argument("--seuil", type=float, default=SEUIL_REGRESSION, help="perte de débit ou hausse mémoire tolérée (défaut : 0.2)")
+    args = parser.parse_args(argv)
+
+    def afficher(cas, mesure):
+        etapes = ", ".join(f"{nom} {duree:.2f}" for nom, duree in sorted(mesure["etapes_ms"].items(), key=lambda item: -item[1])[:3])
+        print(f"{cas:<36} {mesure['par_seconde']:>14,.0f} /s {mesure['memoire_pic_mo']:>9.1f} Mo   {etapes}")
+    print(f"{'cas':<36} {'débit':>17} {'mémoire':>12}   étapes (ms/appel)")
+    releve = executer_benchmarks(args.jeux, args.cas, args.taille_lot, args.repetitions, afficher)
+
+    if args.enregistrer:
+        with open(args.enregistrer, "w", encoding="utf-8") as fichier: json.dump(releve, fichier, indent=2, ensure_ascii=False)
+        print(f"Référence enregistrée : {args.enregistrer}", file=sys.stderr)
+    if args.reference:
+        with open(args.reference, encoding="utf-8") as fichier: reference = json.load(fichier)
+        if reference.get("version_moteur") != releve["version_moteur"]:
+            print(f"Attention : référence mesurée avec VERSION_MOTEUR {reference.get('version_moteur')}.", file=sys.stderr)
+        ecarts = comparer(releve, reference, args.seuil)
+        print(f"\n{'cas':<36} {'débit':>8} {'mémoire':>8}")
+        for cas, debit, memoire, regression in ecarts:
+            print(f"{cas:<36} {debit:>7.0%} {memoire:>8.0%}{'   RÉGRESSION' if regression else ''}")
+        if any(regression for *_, regression in ecarts): return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
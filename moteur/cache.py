@@ -0,0 +1,158 @@
+# moteur/cache.py
+
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# --- CACHE DES RÉSULTATS ---
+# Les résultats sont rangés par espace ("pret", "projection", ...) sous une clé
+# canonique : empreinte SHA-256 des paramètres normalisés (clés triées, valeurs
+# converties en float ou en listes de float). Deux niveaux :
+# - mémoire : un LRU par espace, borné en nombre d'entrées, propre au processus ;
+# - disque (optionnel) : une base SQLite partagée entre sessions et processus,
+#   bornée elle aussi, avec éviction des entrées les moins récemment lues.
+# Les valeurs sont sérialisées avec pickle : la base ne doit pas être partagée
+# avec des processus non fiables.
+
+VERSION_MOTEUR = 4  # À incrémenter quand les calculs changent : invalide la base disque
+TAILLES_MEMOIRE_DEFAUT = {"pret": 256, "projection": 128, "sortie": 64, "objectifs": 64, "sensibilite": 16, "monte_carlo": 16}
+
+
+def normaliser_parametres(params):
+    """Paramètres sous forme canonique : clés triées, valeurs numériques en float (ou listes de float)."""
+    normalises = {}
+    for cle in sorted(params):
+        try:
+            valeur = np.asarray(params[cle], dtype=float)
+            normalises[str(cle)] = valeur.tolist() if valeur.ndim else float(valeur)
+        except (ValueError, TypeError): normalises[str(cle)] = str(params[cle])
+    return normalises
+
+
+def cle_parametres(params, espace=""):
+    """Empreinte canonique d'un jeu de paramètres, pour un espace de cache donné."""
+    contenu = json.dumps([VERSION_MOTEUR, espace, normaliser_parametres(params)], separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()
+
+
+class CacheLRU:
+    """LRU en mémoire, borné en nombre d'entrées, sûr entre threads."""
+
+    def __init__(self, taille_max):
+        self.taille_max = taille_max
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+        self.succes = self.echecs = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def lire(self, cle, defaut=None):
+        with self._verrou:
+            if cle not in self._entrees:
+                self.echecs += 1
+                return defaut
+            self._entrees.move_to_end(cle)
+            self.succes += 1
+            return self._entrees[cle]
+
+    def ecrire(self, cle, valeur):
+        with self._verrou:
+            self._entrees[cle] = valeur
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+                self.evictions += 1
+
+    def vider(self):
+        with self._verrou: self._entrees.clear()
+
+
+class StockageSQLite:
+    """Cache disque partagé : une table SQLite, bornée en nombre d'entrées."""
+
+    def __init__(self, chemin, taille_max=10000):
+        self.chemin, self.taille_max = chemin, taille_max
+        self._verrou = threading.Lock()
+        self._connexion = sqlite3.connect(chemin, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("CREATE TABLE IF NOT EXISTS resultats (cle TEXT PRIMARY KEY, valeur BLOB NOT NULL, acces REAL NOT NULL)")
+        self._connexion.execute("CREATE INDEX IF NOT EXISTS resultats_acces ON resultats (acces)")
+        self.succes = self.echecs = self.evictions = 0
+
+    def __len__(self):
+        with self._verrou: return self._connexion.execute("SELECT COUNT(*) FROM resultats").fetchone()[0]
+
+    def lire(self, cle, defaut=None):
+        with self._verrou:
+            ligne = self._connexion.execute("SELECT valeur FROM resultats WHERE cle = ?", (cle,)).fetchone()
+            if ligne is None:
+                self.echecs += 1
+                return defaut
+            self._connexion.execute("UPDATE resultats SET acces = ? WHERE cle = ?", (time.time(), cle))
+            self.succes += 1
+        return pickle.loads(ligne[0])
+
+    def ecrire(self, cle, valeur):
+        blob = pickle.dumps(valeur, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._verrou:
+            self._connexion.execute("INSERT OR REPLACE INTO resultats (cle, valeur, acces) VALUES (?, ?, ?)", (cle, blob, time.time()))
+            nb_entrees = self._connexion.execute("SELECT COUNT(*) FROM resultats").fetchone()[0]
+            if nb_entrees > self.taille_max:
+                supprimees = self._connexion.execute(
+                    "DELETE FROM resultats WHERE cle IN (SELECT cle FROM resultats ORDER BY acces LIMIT ?)", (nb_entrees - self.taille_max,)).rowcount
+                self.evictions += max(supprimees, 0)
+
+    def vider(self):
+        with self._verrou: self._connexion.execute("DELETE FROM resultats")
+
+    def fermer(self):
+        with self._verrou: self._connexion.close()
+
+
+class CacheResultats:
+    """Cache à deux niveaux (LRU mémoire par espace, SQLite optionnel)."""
+
+    def __init__(self, tailles_memoire=None, chemin_sqlite=None, taille_max_sqlite=10000):
+        self._tailles_memoire = dict(TAILLES_MEMOIRE_DEFAUT, **(tailles_memoire or {}))
+        self._memoire = {}
+        self._verrou = threading.Lock()
+        self.disque = StockageSQLite(chemin_sqlite, taille_max_sqlite) if chemin_sqlite else None
+
+    def memoire(self, espace):
+        with self._verrou:
+            if espace not in self._memoire:
+                self._memoire[espace] = CacheLRU(self._tailles_memoire.get(espace, 128))
+            return self._memoire[espace]
+
+    def obtenir(self, espace, params, calcul):
+        """Résultat de `calcul()` pour `params`, lu en mémoire, puis sur disque, sinon calculé et stocké."""
+        cle = cle_parametres(params, espace)
+        manquant = object()
+        resultat = self.memoire(espace).lire(cle, manquant)
+        if resultat is not manquant: return resultat
+        if self.disque is not None:
+            resultat = self.disque.lire(cle, manquant)
+            if resultat is not manquant:
+                self.memoire(espace).ecrire(cle, resultat)
+                return resultat
+        resultat = calcul()
+        self.memoire(espace).ecrire(cle, resultat)
+        if self.disque is not None: self.disque.ecrire(cle, resultat)
+        return resultat
+
+    def statistiques(self):
+        """Compteurs par niveau : {nom: {"entrees", "succes", "echecs", "evictions"}}."""
+        niveaux = {f"mémoire/{espace}": cache for espace, cache in sorted(self._memoire.items())}
+        if self.disque is not None: niveaux["disque"] = self.disque
+        return {nom: {"entrees": len(niveau), "succes": niveau.succes, "echecs": niveau.echecs, "evictions": niveau.evictions} for nom, niveau in niveaux.items()}
+
+    def vider(self):
+        for cache in list(self._memoire.values()): cache.vider()
+        if self.disque is not None: self.disque.vider()
@@ -0,0 +1,81 @@
+# moteur/chrono.py
+
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+
+# --- CHRONOMÉTRAGE DES ÉTAPES DU MOTEUR ---
+# Les fonctions du moteur sont marquées par @chronometre("nom") ou entourent une
+# partie de leur code de `with etape("nom")`. Rien n'est mesuré tant qu'aucun
+# relevé n'est actif : le coût se limite alors à la lecture d'une variable de
+# contexte. Un relevé est propre au thread (ou à la tâche asyncio) qui l'active,
+# donc à la session Streamlit. Les temps sont inclusifs : une étape contient
+# celles qu'elle appelle.
+
+_releve_actif = contextvars.ContextVar("releve_actif", default=None)
+
+
+class Releve:
+    """Temps cumulés par étape pendant qu'il est actif : {nom: [appels, total_s, max_s]}."""
+
+    def __init__(self):
+        self.etapes = {}
+        self._jeton = None
+
+    def ajouter(self, nom, duree):
+        cumul = self.etapes.setdefault(nom, [0, 0.0, 0.0])
+        cumul[0] += 1; cumul[1] += duree; cumul[2] = max(cumul[2], duree)
+
+    def demarrer(self):
+        self._jeton = _releve_actif.set(self)
+        return self
+
+    def arreter(self):
+        if self._jeton is not None: _releve_actif.reset(self._jeton); self._jeton = None
+
+    def __enter__(self):
+        return self.demarrer()
+
+    def __exit__(self, *exc):
+        self.arreter()
+
+    def tableau(self):
+        """Étapes triées par temps total décroissant, en liste de dicts."""
+        return [{"Étape": nom, "Appels": appels, "Total (ms)": total * 1000, "Max (ms)": maximum * 1000}
+                for nom, (appels, total, maximum) in sorted(self.etapes.items(), key=lambda item: -item[1][1])]
+
+
+@contextmanager
+def etape(nom):
+    """Mesure le bloc sous le nom `nom` dans le relevé actif, s'il y en a un."""
+    releve = _releve_actif.get()
+    if releve is None:
+        yield
+        return
+    debut = time.perf_counter()
+    try: yield
+    finally: releve.ajouter(nom, time.perf_counter() - debut)
+
+
+def chronometre(nom):
+    """Décorateur : mesure chaque appel de la fonction sous le nom `nom`."""
+    def decorer(fonction):
+        @functools.wraps(fonction)
+        def envelopper(*args, **kwargs):
+            releve = _releve_actif.get()
+            if releve is None: return fonction(*args, **kwargs)
+            debut = time.perf_counter()
+            try: return fonction(*args, **kwargs)
+            finally: releve.ajouter(nom, time.perf_counter() - debut)
+        return envelopper
+    return decorer
+
+
+def activer(releve):
+    """Rend `releve` (ou None) actif pour le thread courant, sans restauration.
+
+    Pour les scripts exécutés de bout en bout, comme la page Streamlit : chaque
+    exécution remplace le relevé de la précédente, même interrompue.
+    """
+    _releve_actif.set(releve)
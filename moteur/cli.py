@@ -0,0 +1,155 @@
+# moteur/cli.py
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from moteur.projection import PARAMETRES_SIMULATION, generer_projection_lmnp_lot, indicateurs_projection
+from moteur.tri import LIBELLES_STATUT_TRI
+
+# --- SCORING EN LOT D'UN FICHIER D'AFFAIRES (CSV / PARQUET) ---
+# Le fichier est lu par blocs ; chaque bloc est projeté par un processus du
+# pool et les indicateurs sont écrits au fil de l'eau, dans l'ordre d'entrée.
+# Au plus 2 blocs par processus sont en cours à la fois : la mémoire reste
+# bornée quelle que soit la taille du fichier.
+#
+#   python -m moteur annonces.csv resultats.parquet --processus 8 --taille-bloc 20000
+
+
+def _est_parquet(chemin):
+    return os.path.splitext(chemin)[1].lower() in (".parquet", ".pq")
+
+
+def lire_blocs(chemin, taille_bloc):
+    """Itère sur le fichier d'entrée par DataFrames d'au plus `taille_bloc` lignes."""
+    if _est_parquet(chemin):
+        try: import pyarrow.parquet as pq
+        except ImportError: raise SystemExit("La lecture Parquet nécessite pyarrow (pip install pyarrow).")
+        for lot in pq.ParquetFile(chemin).iter_batches(batch_size=taille_bloc):
+            yield lot.to_pandas()
+    else:
+        yield from pd.read_csv(chemin, chunksize=taille_bloc)
+
+
+class EcrivainResultats:
+    """Écriture incrémentale des résultats, en CSV ou en Parquet selon l'extension."""
+
+    def __init__(self, chemin):
+        self.chemin, self._parquet = chemin, _est_parquet(chemin)
+        self._fichier = self._ecrivain = None
+
+    def ecrire(self, df):
+        if self._parquet:
+            try: import pyarrow as pa, pyarrow.parquet as pq
+            except ImportError: raise SystemExit("L'écriture Parquet nécessite pyarrow (pip install pyarrow).")
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._ecrivain is None: self._ecrivain = pq.ParquetWriter(self.chemin, table.schema)
+            self._ecrivain.write_table(table.cast(self._ecrivain.schema))
+        else:
+            entete = self._fichier is None
+            if entete: self._fichier = open(self.chemin, "w", newline="", encoding="utf-8")
+            df.to_csv(self._fichier, header=entete, index=False)
+
+    def fermer(self):
+        if self._ecrivain is not None: self._ecrivain.close()
+        if self._fichier is not None: self._fichier.close()
+
+
+def scorer_bloc(colonnes, annee=None):
+    """Indicateurs d'un bloc de paramètres {nom: tableau (N,)} ; les lignes incomplètes sortent en NaN."""
+    n = len(next(iter(colonnes.values()))) if colonnes else 0
+    valides = np.ones(n, dtype=bool)
+    for valeurs in colonnes.values(): valides &= np.isfinite(valeurs)
+    lot = generer_projection_lmnp_lot({nom: valeurs[valides] for nom, valeurs in colonnes.items()}, horizon=annee)
+    resultats = {}
+    for nom, valeurs in indicateurs_projection(lot, annee).items():
+        complet = np.full(n, np.nan) if valeurs.dtype.kind == "f" else np.full(n, -1, dtype=valeurs.dtype)
+        complet[valides] = valeurs
+        resultats[nom] = complet
+    resultats["Erreur"] = np.where(valides, "", "paramètres manquants ou non numériques")
+    return resultats
+
+
+def preparer_bloc(bloc, defauts):
+    """Colonnes de paramètres du bloc, converties en float (NaN si non numérique).
+
+    Lève ValueError si un paramètre n'est ni une colonne du bloc ni dans `defauts`.
+    """
+    manquants = [nom for nom in PARAMETRES_SIMULATION if nom not in bloc.columns and nom not in defauts]
+    if manquants: raise ValueError(f"Colonnes absentes du fichier, sans valeur par défaut (--defaut) : {', '.join(manquants)}")
+    colonnes = {nom: np.full(len(bloc), float(valeur)) for nom, valeur in defauts.items()}
+    for nom in PARAMETRES_SIMULATION:
+        if nom in bloc.columns: colonnes[nom] = pd.to_numeric(bloc[nom], errors="coerce").to_numpy(dtype=float)
+    return colonnes
+
+
+def _assembler(bloc, conservees, resultats):
+    sortie = bloc[conservees].reset_index(drop=True)
+    for nom, valeurs in resultats.items(): sortie[nom] = valeurs
+    sortie["Statut TRI"] = sortie["Statut TRI"].map(LIBELLES_STATUT_TRI).fillna("")
+    return sortie
+
+
+def scorer_fichier(entree, sortie, taille_bloc=10000, nb_processus=None, annee=None, defauts=None, conservees=None, progression=None):
+    """Projette chaque ligne de `entree` et écrit ses indicateurs dans `sortie`. Renvoie le nombre de lignes."""
+    nb_processus = nb_processus or os.cpu_count() or 1
+    defauts = defauts or {}
+    ecrivain, en_cours, nb_lignes = EcrivainResultats(sortie), deque(), 0
+    pool = ProcessPoolExecutor(max_workers=nb_processus) if nb_processus > 1 else None
+
+    def ecrire_plus_ancien():
+        nonlocal nb_lignes
+        bloc, colonnes_conservees, futur = en_cours.popleft()
+        resultats = futur.result() if pool is not None else futur
+        ecrivain.ecrire(_assembler(bloc, colonnes_conservees, resultats))
+        nb_lignes += len(bloc)
+        if progression is not None: progression(nb_lignes)
+
+    try:
+        for bloc in lire_blocs(entree, taille_bloc):
+            colonnes_conservees = [c for c in bloc.columns if c not in PARAMETRES_SIMULATION] if conservees is None else list(conservees)
+            colonnes = preparer_bloc(bloc, defauts)
+            futur = pool.submit(scorer_bloc, colonnes, annee) if pool is not None else scorer_bloc(colonnes, annee)
+            en_cours.append((bloc[colonnes_conservees], colonnes_conservees, futur))
+            if len(en_cours) >= 2 * nb_processus: ecrire_plus_ancien()
+        while en_cours: ecrire_plus_ancien()
+    finally:
+        if pool is not None: pool.shutdown(cancel_futures=True)
+        ecrivain.fermer()
+    return nb_lignes
+
+
+def _lire_defaut(texte):
+    nom, _, valeur = texte.partition("=")
+    if nom not in PARAMETRES_SIMULATION: raise argparse.ArgumentTypeError(f"paramètre inconnu : {nom}")
+    try: return nom, float(valeur)
+    except ValueError: raise argparse.ArgumentTypeError(f"valeur non numérique pour {nom} : {valeur}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m moteur", description="Projette un fichier d'affaires (CSV ou Parquet) et écrit leurs indicateurs de rentabilité.")
+    parser.add_argument("entree", help="fichier d'affaires, une ligne par affaire, une colonne par paramètre de simulation")
+    parser.add_argument("sortie", help="fichier de résultats (.csv ou .parquet)")
+    parser.add_argument("--taille-bloc", type=int, default=10000, help="lignes par bloc (défaut : 10000)")
+    parser.add_argument("--processus", type=int, default=None, help="processus de calcul (défaut : nombre de cœurs)")
+    parser.add_argument("--annee", type=int, default=None, help="année de revente des indicateurs (défaut : fin du prêt)")
+    parser.add_argument("--defaut", type=_lire_defaut, action="append", default=[], metavar="PARAM=VALEUR",
+                        help="valeur d'un paramètre absent du fichier (répétable) ; tout paramètre absent doit en avoir une")
+    parser.add_argument("--conserver", nargs="*", default=None, metavar="COLONNE",
+                        help="colonnes d'entrée recopiées en sortie (défaut : toutes sauf les paramètres)")
+    args = parser.parse_args(argv)
+
+    debut = time.perf_counter()
+    def progression(nb_lignes):
+        duree = time.perf_counter() - debut
+        print(f"\r{nb_lignes:,} affaires ({nb_lignes / max(duree, 1e-9):,.0f}/s)", end="", file=sys.stderr, flush=True)
+    try: nb_lignes = scorer_fichier(args.entree, args.sortie, args.taille_bloc, args.processus, args.annee, dict(args.defaut), args.conserver, progression)
+    except ValueError as erreur: parser.error(str(erreur))
+    print(f"\r{nb_lignes:,} affaires traitées en {time.perf_counter() - debut:.1f} s -> {args.sortie}", file=sys.stderr)
+    return 0
@@ -0,0 +1,59 @@
+# moteur/fiscalite.py
+
+import numpy as np
+
+from moteur.chrono import chronometre
+
+# --- IMPÔT SUR LA PLUS-VALUE, VECTORISÉ SUR LES PLUS-VALUES ET LES DURÉES ---
+# IR 19 %, PS 17,2 %, abattements pour durée de détention au-delà de 5 ans :
+# - IR : 6 % par an de la 6e à la 21e année, 4 % la 22e (exonération à 22 ans) ;
+# - PS : 1,65 % par an de la 6e à la 21e année, 1,60 % la 22e, puis 9 % par an
+#   jusqu'à la 30e (exonération à 30 ans).
+# Les abattements cumulés sont précalculés une fois par durée (0 à 30 ans).
+
+TAUX_IR_PV = 0.19
+TAUX_PS_PV = 0.172
+DUREE_EXONERATION_IR, DUREE_EXONERATION_PS = 22, 30
+
+_annees = np.arange(DUREE_EXONERATION_PS + 1)
+ABATTEMENTS_IR = np.minimum(np.cumsum(np.select([(_annees >= 6) & (_annees <= 21), _annees == 22], [0.06, 0.04], 0.0)), 1.0)
+ABATTEMENTS_PS = np.minimum(np.cumsum(np.select([(_annees >= 6) & (_annees <= 21), _annees == 22, _annees >= 23], [0.0165, 0.016, 0.09], 0.0)), 1.0)
+ABATTEMENTS_IR[DUREE_EXONERATION_IR:], ABATTEMENTS_PS[DUREE_EXONERATION_PS:] = 1.0, 1.0
+ABATTEMENTS_IR.flags.writeable = ABATTEMENTS_PS.flags.writeable = False
+_ABATTEMENTS_IR, _ABATTEMENTS_PS = tuple(ABATTEMENTS_IR.tolist()), tuple(ABATTEMENTS_PS.tolist())  # accès scalaire sans NumPy
+_TYPES_SCALAIRES = (int, float, np.integer, np.floating)
+
+
+def abattements_plus_value(duree_detention):
+    """Abattements (IR, PS) pour une durée de détention en années (scalaire ou tableau)."""
+    if isinstance(duree_detention, _TYPES_SCALAIRES):
+        indice = min(max(int(duree_detention), 0), DUREE_EXONERATION_PS)
+        return _ABATTEMENTS_IR[indice], _ABATTEMENTS_PS[indice]
+    indices = np.clip(np.asarray(duree_detention).astype(int), 0, DUREE_EXONERATION_PS)
+    abattement_ir, abattement_ps = ABATTEMENTS_IR[indices], ABATTEMENTS_PS[indices]
+    if indices.ndim == 0: return float(abattement_ir), float(abattement_ps)
+    return abattement_ir, abattement_ps
+
+
+@chronometre("fiscalite.impot_plus_value")
+def impot_plus_value(plus_values_brutes, duree_detention):
+    """Impôt total (IR + PS) sur des plus-values brutes ; la durée de détention est diffusée contre elles."""
+    plus_values_brutes = np.asarray(plus_values_brutes, dtype=float)
+    abattement_ir, abattement_ps = abattements_plus_value(duree_detention)
+    impot_sur_revenu_pv = plus_values_brutes * (1 - abattement_ir) * TAUX_IR_PV
+    prelevements_sociaux_pv = plus_values_brutes * (1 - abattement_ps) * TAUX_PS_PV
+    impot_total_pv = np.maximum(0, impot_sur_revenu_pv) + np.maximum(0, prelevements_sociaux_pv)
+    return np.where(plus_values_brutes > 0, impot_total_pv, 0.0)
+
+
+@chronometre("fiscalite.calculer_impot_plus_value")
+def calculer_impot_plus_value(plus_value_brute, duree_detention):
+    if plus_value_brute <= 0: return 0, 0, 0, 0
+    indice = min(max(int(duree_detention), 0), DUREE_EXONERATION_PS)
+    abattement_ir, abattement_ps = _ABATTEMENTS_IR[indice], _ABATTEMENTS_PS[indice]
+    base_imposable_ir = plus_value_brute * (1 - abattement_ir)
+    impot_sur_revenu_pv = base_imposable_ir * TAUX_IR_PV
+    base_imposable_ps = plus_value_brute * (1 - abattement_ps)
+    prelevements_sociaux_pv = base_imposable_ps * TAUX_PS_PV
+    impot_total_pv = max(0, impot_sur_revenu_pv) + max(0, prelevements_sociaux_pv)
+    return impot_total_pv, plus_value_brute, base_imposable_ir, base_imposable_ps
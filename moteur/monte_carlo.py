@@ -0,0 +1,126 @@
+# moteur/monte_carlo.py
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from moteur.chrono import chronometre
+from moteur.projection import generer_projection_lmnp_lot
+
+# --- SIMULATION MONTE CARLO ---
+# Tire des trajectoires d'inflation, de revalorisation du bien, de vacance
+# locative et de révision du taux du prêt, puis les passe en un seul lot au
+# moteur de projection. Les trajectoires sont générées par blocs de taille fixe,
+# chacun avec sa propre graine (SeedSequence.spawn) : le résultat ne dépend
+# donc pas du nombre de processus utilisés.
+
+COLONNES_MONTE_CARLO = ("Cash-flow Net", "Bénéfice Net Total", "TRI (%)")
+PERCENTILES = (5, 50, 95)
+TAILLE_BLOC = 2500
+
+
+@dataclass(frozen=True)
+class HypothesesStochastiques:
+    """Dispersion des hypothèses autour des valeurs saisies (points de %)."""
+    ecart_type_inflation_pc: float = 1.0
+    persistance_inflation: float = 0.7        # coefficient AR(1) de l'inflation
+    ecart_type_revalo_pc: float = 3.0
+    correlation_inflation_revalo: float = 0.5
+    mois_vacance_moyens: float = 0.5          # par an, loi de Poisson bornée à 12 mois
+    periodicite_revision_ans: int = 0         # 0 : taux fixe ; sinon révision tous les N ans
+    ecart_type_revision_taux_pc: float = 0.75 # variation du taux à chaque révision
+    taux_plancher_pc: float = 0.1
+
+
+@dataclass(frozen=True)
+class ResultatMonteCarlo:
+    """`bandes[colonne]` : tableau (3, A) des percentiles P5/P50/P95 par année.
+
+    `part_sans_tri` (A,) : part des trajectoires sans TRI, exclues des bandes de
+    TRI. `probabilite_abondement_annuelle` (A,) : probabilité d'un abondement
+    dans l'année ; `probabilite_abondement` : au moins un sur toute la durée.
+    """
+    annees: np.ndarray
+    bandes: dict
+    part_sans_tri: np.ndarray
+    probabilite_abondement_annuelle: np.ndarray
+    probabilite_abondement: float
+    nb_trajectoires: int
+
+
+def tirer_trajectoires(params, hypotheses, nb_trajectoires, nb_annees, generateur):
+    """Trajectoires (N, A) et paliers de taux pour generer_projection_lmnp_lot."""
+    inflation_moyenne = float(params.get("inflation_pc", 0))
+    revalo_moyenne = float(params.get("revalo_bien_pc", 0))
+    phi = hypotheses.persistance_inflation
+    chocs_inflation = generateur.standard_normal((nb_trajectoires, nb_annees + 1))
+    chocs_revalo = generateur.standard_normal((nb_trajectoires, nb_annees + 1))
+
+    # Inflation AR(1) autour de la valeur saisie, stationnaire dès la première année :
+    # écart réduit (variance 1), indépendant de l'écart-type, puis mis à l'échelle
+    ecart_reduit = np.empty((nb_trajectoires, nb_annees + 1))
+    ecart_reduit[:, 0] = chocs_inflation[:, 0]
+    innovation = np.sqrt(1 - phi ** 2)
+    for annee in range(1, nb_annees + 1):
+        ecart_reduit[:, annee] = phi * ecart_reduit[:, annee - 1] + innovation * chocs_inflation[:, annee]
+    inflation = inflation_moyenne + hypotheses.ecart_type_inflation_pc * ecart_reduit
+
+    # Revalorisation corrélée à l'écart réduit : sa dispersion ne dépend que de son propre écart-type
+    rho = hypotheses.correlation_inflation_revalo
+    chocs_correles = rho * ecart_reduit + np.sqrt(1 - rho ** 2) * chocs_revalo
+    revalo = revalo_moyenne + hypotheses.ecart_type_revalo_pc * chocs_correles
+    vacance = np.minimum(generateur.poisson(hypotheses.mois_vacance_moyens, (nb_trajectoires, nb_annees + 1)), 12)
+
+    paliers = []
+    if hypotheses.periodicite_revision_ans > 0:
+        taux = np.full(nb_trajectoires, float(params.get("taux_interet_pret", 0)))
+        for annee in range(hypotheses.periodicite_revision_ans, nb_annees, hypotheses.periodicite_revision_ans):
+            taux = np.maximum(taux + hypotheses.ecart_type_revision_taux_pc * generateur.standard_normal(nb_trajectoires), hypotheses.taux_plancher_pc)
+            paliers.append((12 * annee + 1, taux))
+    return {"inflation_pc": inflation, "revalo_bien_pc": revalo[:, :nb_annees], "mois_vacance": vacance}, paliers
+
+
+def _simuler_bloc(params, hypotheses, nb_trajectoires, graine):
+    nb_annees = int(float(params.get("duree_pret", 0)))
+    trajectoires, paliers = tirer_trajectoires(params, hypotheses, nb_trajectoires, nb_annees, np.random.default_rng(graine))
+    lot = generer_projection_lmnp_lot({k: np.full(nb_trajectoires, float(v)) for k, v in params.items()}, trajectoires=trajectoires, paliers_taux=paliers)
+    return {colonne: lot.colonnes[colonne] for colonne in COLONNES_MONTE_CARLO}, lot.abondement
+
+
+@chronometre("monte_carlo")
+def simuler_monte_carlo(params, nb_trajectoires=10000, hypotheses=HypothesesStochastiques(), graine=None, nb_processus=1):
+    """Bandes P5/P50/P95 par année et probabilité d'abondement, sur `nb_trajectoires` tirages.
+
+    Avec `nb_processus` > 1, les blocs de trajectoires sont répartis sur un
+    pool de processus.
+    """
+    if nb_trajectoires < 1: raise ValueError("Le nombre de trajectoires doit être au moins 1.")
+    nb_annees = int(float(params.get("duree_pret", 0)))
+    tailles = [TAILLE_BLOC] * (nb_trajectoires // TAILLE_BLOC) + ([nb_trajectoires % TAILLE_BLOC] if nb_trajectoires % TAILLE_BLOC else [])
+    graines = np.random.SeedSequence(graine).spawn(len(tailles))
+    taches = [(dict(params), hypotheses, taille, graine_bloc) for taille, graine_bloc in zip(tailles, graines)]
+    if nb_processus > 1 and len(taches) > 1:
+        with ProcessPoolExecutor(max_workers=nb_processus) as pool:
+            blocs = list(pool.map(_simuler_bloc, *zip(*taches)))
+    else:
+        blocs = [_simuler_bloc(*tache) for tache in taches]
+
+    colonnes = {colonne: np.concatenate([bloc[0][colonne] for bloc in blocs]) for colonne in COLONNES_MONTE_CARLO}
+    abondement = np.concatenate([bloc[1] for bloc in blocs])
+    with np.errstate(invalid="ignore"):
+        bandes = {colonne: np.nanpercentile(valeurs, PERCENTILES, axis=0) if nb_annees else np.empty((len(PERCENTILES), 0))
+                  for colonne, valeurs in colonnes.items()}
+    return ResultatMonteCarlo(
+        annees=np.arange(1, nb_annees + 1),
+        bandes=bandes,
+        part_sans_tri=np.isnan(colonnes["TRI (%)"]).mean(axis=0),
+        probabilite_abondement_annuelle=(abondement > 0).mean(axis=0),
+        probabilite_abondement=float((abondement > 0).any(axis=1).mean()),
+        nb_trajectoires=nb_trajectoires,
+    )
+
+
+def cle_hypotheses(hypotheses):
+    """Hypothèses sous forme de dict plat, pour les clés de cache."""
+    return {f"mc_{nom}": valeur for nom, valeur in asdict(hypotheses).items()}
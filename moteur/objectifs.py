@@ -0,0 +1,177 @@
+# moteur/objectifs.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from moteur.cache import CacheLRU
+from moteur.chrono import chronometre
+from moteur.projection import PARAMETRES_SIMULATION, generer_projection_lmnp_lot, indicateurs_projection
+
+# --- RECHERCHE D'OBJECTIFS (GOAL-SEEK) ---
+# Un objectif fixe tous les paramètres sauf un (`variable`) et cherche la plus
+# grande (sens "max") ou la plus petite (sens "min") valeur de celle-ci pour
+# laquelle un indicateur de indicateurs_projection respecte une contrainte,
+# ex. « prix d'achat maximal pour un TRI >= 6 % ».
+# L'indicateur est supposé monotone en la variable entre ses bornes : on tient
+# un encadrement [point faisable, point infaisable] que chaque tour resserre.
+# Un tour évalue, pour tous les objectifs à la fois et en un seul appel au
+# moteur par lots, une grille de points de l'encadrement plus deux points
+# autour de l'estimation par fausse position ; la valeur rendue est toujours
+# du côté faisable, à `tolerance` près.
+
+OBJECTIF_ATTEINT, OBJECTIF_INFAISABLE, OBJECTIF_BORNE, OBJECTIF_NON_CONVERGE = 0, 1, 2, 3
+LIBELLES_STATUT_OBJECTIF = {OBJECTIF_ATTEINT: "atteint", OBJECTIF_INFAISABLE: "infaisable entre les bornes",
+                            OBJECTIF_BORNE: "contrainte respectée jusqu'à la borne", OBJECTIF_NON_CONVERGE: "non convergé"}
+
+NB_POINTS = 14
+ECARTS_DEPART = (1e-4, 1e-3, 1e-2)  # points testés de part et d'autre d'une solution précédente, en part de l'intervalle
+TOURS_MAX = 30
+
+
+@dataclass(frozen=True)
+class Objectif:
+    """`variable` (paramètre de simulation) la plus grande ou la plus petite (`sens`) telle que `indicateur` `comparaison` `cible`.
+
+    `annee` : année de revente de l'indicateur (par défaut, fin du prêt).
+    `borne_max` : par défaut, 10 fois la valeur saisie de la variable (au moins 1000).
+    """
+    variable: str
+    indicateur: str
+    cible: float
+    sens: str = "max"
+    comparaison: str = ">="
+    annee: int = None
+    borne_min: float = 0.0
+    borne_max: float = None
+    tolerance: float = 0.01
+
+
+@dataclass(frozen=True)
+class ResultatObjectif:
+    """Valeur trouvée pour la variable (NaN si infaisable), indicateur obtenu, statut et nombre de tours."""
+    valeur: float
+    valeur_indicateur: float
+    statut: int
+    nb_tours: int
+
+
+def _verifier(objectif):
+    if objectif.variable not in PARAMETRES_SIMULATION: raise ValueError(f"Paramètre inconnu : {objectif.variable}")
+    if objectif.sens not in ("max", "min"): raise ValueError("Le sens d'un objectif est 'max' ou 'min'.")
+    if objectif.comparaison not in (">=", "<="): raise ValueError("La comparaison d'un objectif est '>=' ou '<='.")
+
+
+def _evaluer_objectifs(params, objectifs, valeurs):
+    """Indicateurs des objectifs pour des valeurs (O, P) de leurs variables, en un appel au moteur."""
+    nb_objectifs, nb_points = valeurs.shape
+    colonnes = {cle: np.full(nb_objectifs * nb_points, float(valeur)) for cle, valeur in params.items()}
+    for i, objectif in enumerate(objectifs):
+        colonnes.setdefault(objectif.variable, np.zeros(nb_objectifs * nb_points))[i * nb_points:(i + 1) * nb_points] = valeurs[i]
+    # Chaque objectif est projeté jusqu'à sa propre année de revente (par défaut, fin du prêt)
+    horizons = np.repeat([objectif.annee if objectif.annee is not None else 0 for objectif in objectifs], nb_points)
+    # TRI : seules les années de revente demandées sont calculées
+    annees_tri = {objectif.annee for objectif in objectifs if objectif.annee is not None}
+    for i, objectif in enumerate(objectifs):
+        if objectif.indicateur == "TRI (%)" and objectif.annee is None:
+            annees_tri.update(np.trunc(colonnes.get("duree_pret", np.zeros(1))[i * nb_points:(i + 1) * nb_points]).astype(int).tolist())
+    lot = generer_projection_lmnp_lot(colonnes, horizon=horizons, annees_tri=sorted(annees_tri))
+    indicateurs = {}
+    resultats = np.empty((nb_objectifs, nb_points))
+    for i, objectif in enumerate(objectifs):
+        if objectif.annee not in indicateurs: indicateurs[objectif.annee] = indicateurs_projection(lot, objectif.annee)
+        resultats[i] = indicateurs[objectif.annee][objectif.indicateur][i * nb_points:(i + 1) * nb_points]
+    return resultats
+
+
+@chronometre("objectifs")
+def resoudre_objectifs(params, objectifs, departs=None, nb_points=NB_POINTS, tours_max=TOURS_MAX):
+    """Résout plusieurs objectifs sur les mêmes paramètres ; `departs` : valeurs de départ (ou None) par objectif."""
+    objectifs = list(objectifs)
+    for objectif in objectifs: _verifier(objectif)
+    nb_objectifs = len(objectifs)
+    if not nb_objectifs: return []
+    departs = list(departs) if departs is not None else [None] * nb_objectifs
+
+    valeurs_saisies = np.array([float(params.get(objectif.variable, 0)) for objectif in objectifs])
+    borne_min = np.array([objectif.borne_min for objectif in objectifs], dtype=float)
+    borne_max = np.array([objectif.borne_max if objectif.borne_max is not None else max(10 * abs(v), 1000.0) for objectif, v in zip(objectifs, valeurs_saisies)])
+    # Encadrement orienté du côté supposé faisable (x_f) vers l'autre (x_i)
+    sens_max = np.array([objectif.sens == "max" for objectif in objectifs])
+    x_f, x_i = np.where(sens_max, borne_min, borne_max), np.where(sens_max, borne_max, borne_min)
+    cible = np.array([objectif.cible for objectif in objectifs], dtype=float)
+    signe = np.array([1.0 if objectif.comparaison == ">=" else -1.0 for objectif in objectifs])
+    tolerance = np.array([objectif.tolerance for objectif in objectifs], dtype=float)
+
+    # Premier tour : bornes, grille et points autour des valeurs de départ
+    grille = np.linspace(0, 1, nb_points + 2)
+    t = np.tile(grille, (nb_objectifs, 1))
+    largeur = x_i - x_f
+    for i, depart in enumerate(departs):
+        if depart is not None and largeur[i] != 0:
+            t_depart = (float(depart) - x_f[i]) / largeur[i]
+            ecarts = np.array(ECARTS_DEPART)
+            t[i, 1:1 + 2 * ecarts.size] = np.clip(np.concatenate((t_depart - ecarts, t_depart + ecarts)), 0, 1)
+    t.sort(axis=1)
+    # Écart signé à la cible : >= 0 faisable, < 0 ou NaN (ex. pas de TRI) infaisable
+    g = signe[:, None] * (_evaluer_objectifs(params, objectifs, x_f[:, None] + t * largeur[:, None]) - cible[:, None])
+    faisable = g >= 0
+
+    statut = np.full(nb_objectifs, OBJECTIF_NON_CONVERGE)
+    statut[~faisable[:, 0]] = OBJECTIF_INFAISABLE
+    statut[faisable.all(axis=1)] = OBJECTIF_BORNE
+    g_f, g_i = g[:, 0].copy(), g[:, -1].copy()
+    valeur, valeur_ecart = np.where(statut == OBJECTIF_BORNE, x_i, x_f), np.where(statut == OBJECTIF_BORNE, g_i, g_f)
+    nb_tours = np.ones(nb_objectifs, dtype=int)
+    en_cours = statut == OBJECTIF_NON_CONVERGE
+
+    for tour in range(tours_max + 1):
+        if tour:
+            # Grille sur l'encadrement, plus la fausse position ± tolérance / 2
+            largeur = x_i - x_f
+            t = np.tile(grille[1:-1], (nb_objectifs, 1))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t_secante = g_f / (g_f - g_i)
+                demi_pas = 0.5 * tolerance / np.abs(largeur)
+            secante = np.isfinite(t_secante) & (t_secante > 0) & (t_secante < 1)
+            t[:, 0] = np.where(secante, np.clip(t_secante - demi_pas, 0, 1), t[:, 0])
+            t[:, -1] = np.where(secante, np.clip(t_secante + demi_pas, 0, 1), t[:, -1])
+            t.sort(axis=1)
+            t = np.concatenate((np.zeros((nb_objectifs, 1)), t, np.ones((nb_objectifs, 1))), axis=1)
+            g = np.full(t.shape, np.nan)
+            actifs = np.flatnonzero(en_cours)
+            valeurs_indicateur = _evaluer_objectifs(params, [objectifs[i] for i in actifs], x_f[actifs, None] + t[actifs, 1:-1] * largeur[actifs, None])
+            g[actifs, 1:-1] = signe[actifs, None] * (valeurs_indicateur - cible[actifs, None])
+            g[:, 0], g[:, -1] = g_f, g_i
+            faisable = g >= 0
+            nb_tours[en_cours] += 1
+        # Premier point infaisable : le nouvel encadrement est [j - 1, j]
+        lignes = np.flatnonzero(en_cours)
+        j = np.argmin(faisable[lignes], axis=1)
+        x = x_f[lignes, None] + t[lignes] * (x_i - x_f)[lignes, None]
+        x_f[lignes], x_i[lignes] = x[np.arange(lignes.size), j - 1], x[np.arange(lignes.size), j]
+        g_f[lignes], g_i[lignes] = g[lignes, j - 1], g[lignes, j]
+        valeur[lignes], valeur_ecart[lignes] = x_f[lignes], g_f[lignes]
+        converge = en_cours & (np.abs(x_i - x_f) <= tolerance)
+        statut[converge] = OBJECTIF_ATTEINT
+        en_cours &= ~converge
+        if not en_cours.any(): break
+
+    valeur = np.where(statut == OBJECTIF_INFAISABLE, np.nan, valeur)
+    valeur_indicateur = np.where(statut == OBJECTIF_INFAISABLE, np.nan, cible + signe * valeur_ecart)
+    return [ResultatObjectif(valeur=float(valeur[i]), valeur_indicateur=float(valeur_indicateur[i]), statut=int(statut[i]), nb_tours=int(nb_tours[i]))
+            for i in range(nb_objectifs)]
+
+
+class SolveurObjectifs:
+    """Résolution d'objectifs démarrée sur les dernières solutions trouvées pour les mêmes objectifs."""
+
+    def __init__(self, taille_max=256):
+        self._solutions = CacheLRU(taille_max)
+
+    def resoudre(self, params, objectifs):
+        objectifs = list(objectifs)
+        resultats = resoudre_objectifs(params, objectifs, [self._solutions.lire(objectif) for objectif in objectifs])
+        for objectif, resultat in zip(objectifs, resultats):
+            if resultat.statut == OBJECTIF_ATTEINT: self._solutions.ecrire(objectif, resultat.valeur)
+        return resultats
@@ -0,0 +1,202 @@
+# moteur/portefeuille.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from moteur.chrono import chronometre
+from moteur.fiscalite import impot_plus_value
+from moteur.pret import calculer_echeanciers
+from moteur.projection import COLONNES_PROJECTION, PRELEVEMENTS_SOCIAUX_REVENUS, lire_parametres
+from moteur.tri import tri_sortie_annuelle
+
+# --- PORTEFEUILLE DE LOTS DANS UNE MÊME SARL ---
+# Chaque lot a ses propres échéanciers (loyers, charges, prêt, amortissements,
+# valeur de revente nette), calculés en tableaux (P, H) sur le calendrier de la
+# société : ligne = lot, colonne = année de la SARL, zéros avant l'acquisition.
+# La SARL n'a qu'une trésorerie, un déficit reportable et une politique de
+# distribution : la boucle annuelle porte sur les totaux (H,) des lots. Ajouter
+# ou retirer un lot ne calcule que ses lignes ; la boucle de société, en O(H),
+# est refaite à chaque projection.
+# Un lot acquis à l'année a suit le modèle mono-lot en années de détention
+# (loyers et charges indexés depuis son acquisition, abattements sur la
+# plus-value selon sa propre durée de détention) ; un portefeuille d'un seul lot
+# acquis en année 1 redonne generer_projection_lmnp_lot.
+# Revente à l'année t : tous les lots détenus sont vendus et la trésorerie
+# reversée, comme la revente du modèle mono-lot.
+
+PARAMETRES_LOT = ("prix_achat", "cout_travaux", "valeur_meubles", "loyer_mensuel", "apport_personnel", "frais_notaire", "duree_pret",
+                  "taux_interet_pret", "taux_assurance_pret", "frais_dossier", "duree_amort_immo", "duree_amort_meubles", "revalo_bien_pc",
+                  "charges_copro", "taxe_fonciere", "frais_gestion_pc", "taux_gli_pc", "assurance_pno", "cfe", "annee_acquisition")
+FLUX_LOT = ("loyer", "charges_cash", "interet", "principal", "assurance", "amortissement", "pv_brute", "impot_pv", "revente_nette")
+
+
+@dataclass(frozen=True)
+class ProjectionPortefeuille:
+    """Projection de la SARL : `colonnes` (H,) de COLONNES_PROJECTION, revente de tous les lots détenus à l'année t.
+
+    `statut_tri` (H,) : codes de moteur.tri ; `abondement` (H,) : apports des
+    associés pour renflouer la trésorerie ; `nb_lots` (H,) : lots détenus.
+    """
+    colonnes: dict
+    statut_tri: np.ndarray
+    abondement: np.ndarray
+    nb_lots: np.ndarray
+
+    def lignes(self):
+        """Projection en liste de dicts, une ligne par année, comme ProjectionLot.scenario."""
+        lignes = [{colonne: self.colonnes[colonne][t] for colonne in COLONNES_PROJECTION} for t in range(self.nb_lots.size)]
+        for ligne, nb_lots in zip(lignes, self.nb_lots):
+            ligne["Année"] = int(ligne["Année"])
+            ligne["Lots détenus"] = int(nb_lots)
+        return lignes
+
+
+def _decaler(tableau, decalages):
+    """Passe des tableaux (P, H) indexés en années de détention au calendrier de la SARL (décalage a - 1)."""
+    colonnes = np.arange(tableau.shape[1]) - decalages[:, None]
+    valides = colonnes >= 0
+    return np.where(valides, tableau[np.arange(tableau.shape[0])[:, None], np.maximum(colonnes, 0)], 0.0)
+
+
+@chronometre("portefeuille.flux_lots")
+def flux_lots(params_lots, horizon, inflation_pc):
+    """Flux annuels de P lots sur le calendrier de la SARL : ({nom: (P, H)} pour FLUX_LOT, apports (P,), années d'acquisition (P,))."""
+    valeurs, n = lire_parametres(params_lots)
+    def valeur(cle, defaut): return valeurs[cle] if cle in valeurs else np.full(n, float(defaut))
+    annees_acquisition = np.trunc(valeur("annee_acquisition", 1)).astype(int)
+    if ((annees_acquisition < 1) | (annees_acquisition > horizon)).any(): raise ValueError(f"L'année d'acquisition d'un lot doit être comprise entre 1 et {horizon}.")
+
+    prix_achat, cout_travaux, frais_notaire = valeur("prix_achat", 0), valeur("cout_travaux", 0), valeur("frais_notaire", 0)
+    apport, frais_dossier = valeur("apport_personnel", 0), valeur("frais_dossier", 0)
+    montant_pret = prix_achat + cout_travaux + frais_notaire - apport
+    duree_pret = np.trunc(valeur("duree_pret", 0)).astype(int)
+    taux_interet_pret = valeur("taux_interet_pret", 0)
+    annees = np.arange(1, horizon + 1)  # années de détention
+
+    tableau_pret = {cle: np.zeros((n, horizon)) for cle in ("interet", "principal", "crd_fin_annee")}
+    pret_valide = (montant_pret > 0) & (taux_interet_pret > 0) & (duree_pret > 0)
+    if pret_valide.any():
+        annuel = calculer_echeanciers(montant_pret[pret_valide], taux_interet_pret[pret_valide], duree_pret[pret_valide]).annuel()
+        for cle, tableau in annuel.items(): tableau_pret[cle][pret_valide, :min(tableau.shape[1], horizon)] = tableau[:, :horizon]
+
+    facteur_inflation = (1 + inflation_pc / 100) ** (annees - 1)
+    loyer = (valeur("loyer_mensuel", 0) * 12)[:, None] * facteur_inflation
+    charges_copro = (valeur("charges_copro", 0) * 12)[:, None] * facteur_inflation
+    charges_cash = (charges_copro + valeur("taxe_fonciere", 0)[:, None] * facteur_inflation + valeur("assurance_pno", 0)[:, None]
+                    + loyer * (valeur("frais_gestion_pc", 0) / 100)[:, None] + (loyer + charges_copro) * (valeur("taux_gli_pc", 0) / 100)[:, None]
+                    + valeur("cfe", 0)[:, None] * facteur_inflation)
+    charges_cash[:, 0] += frais_dossier
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amort_immo = np.where(annees <= valeur("duree_amort_immo", 0)[:, None], ((prix_achat + frais_notaire) * 0.85 / valeur("duree_amort_immo", 1))[:, None], 0)
+        amort_meubles = np.where(annees <= valeur("duree_amort_meubles", 0)[:, None], (valeur("valeur_meubles", 0) / valeur("duree_amort_meubles", 1))[:, None], 0)
+    amort_travaux = np.where(annees <= 10, (cout_travaux / 10)[:, None], 0)
+
+    prix_revente = (prix_achat + cout_travaux)[:, None] * (1 + valeur("revalo_bien_pc", 0)[:, None] / 100) ** annees
+    pv_brute = prix_revente - (prix_achat + cout_travaux + frais_notaire)[:, None]
+    impot_pv = impot_plus_value(pv_brute, annees)
+
+    decalages = annees_acquisition - 1
+    flux = {
+        "loyer": loyer, "charges_cash": charges_cash, "interet": tableau_pret["interet"], "principal": tableau_pret["principal"],
+        "assurance": np.where(annees <= duree_pret[:, None], (montant_pret * valeur("taux_assurance_pret", 0) / 100)[:, None], 0),
+        "amortissement": amort_immo + amort_travaux + amort_meubles, "pv_brute": pv_brute, "impot_pv": impot_pv,
+        "revente_nette": prix_revente - tableau_pret["crd_fin_annee"] - impot_pv,
+    }
+    return {cle: _decaler(tableau, decalages) for cle, tableau in flux.items()}, apport + frais_dossier, annees_acquisition
+
+
+class Portefeuille:
+    """Lots d'une même SARL, avec les hypothèses de la société (inflation, TMI, distribution)."""
+
+    def __init__(self, horizon, inflation_pc=2.0, tmi_pc=11.0, taux_distrib_pc=100.0):
+        self.horizon, self.inflation_pc = int(horizon), float(inflation_pc)
+        self.tmi_pc, self.taux_distrib_pc = float(tmi_pc), float(taux_distrib_pc)  # modifiables sans recalcul des lots
+        self.identifiants = np.empty(0, dtype=int)
+        self.apports = np.empty(0)
+        self.annees_acquisition = np.empty(0, dtype=int)
+        self._flux = {cle: np.empty((0, self.horizon)) for cle in FLUX_LOT}
+        self._totaux = {cle: np.zeros(self.horizon) for cle in FLUX_LOT}
+        self._prochain_identifiant = 0
+
+    def __len__(self):
+        return self.identifiants.size
+
+    def ajouter(self, params_lots):
+        """Ajoute des lots (DataFrame ou dict de scalaires/tableaux, cf. PARAMETRES_LOT) ; renvoie leurs identifiants."""
+        flux, apports, annees_acquisition = flux_lots(params_lots, self.horizon, self.inflation_pc)
+        identifiants = np.arange(self._prochain_identifiant, self._prochain_identifiant + apports.size)
+        self._prochain_identifiant += apports.size
+        for cle, tableau in flux.items():
+            self._flux[cle] = np.concatenate((self._flux[cle], tableau))
+            self._totaux[cle] += tableau.sum(axis=0)
+        self.identifiants = np.concatenate((self.identifiants, identifiants))
+        self.apports = np.concatenate((self.apports, apports))
+        self.annees_acquisition = np.concatenate((self.annees_acquisition, annees_acquisition))
+        return identifiants
+
+    def retirer(self, identifiants):
+        """Retire des lots par identifiant ; les totaux sont re-sommés pour éviter toute dérive d'arrondi."""
+        garder = ~np.isin(self.identifiants, identifiants)
+        for cle in FLUX_LOT:
+            self._flux[cle] = self._flux[cle][garder]
+            self._totaux[cle] = self._flux[cle].sum(axis=0)
+        self.identifiants, self.apports, self.annees_acquisition = self.identifiants[garder], self.apports[garder], self.annees_acquisition[garder]
+
+    def flux_lot(self, identifiant):
+        """Flux annuels (H,) d'un lot, sur le calendrier de la SARL."""
+        ligne = np.flatnonzero(self.identifiants == identifiant)
+        if not ligne.size: raise KeyError(identifiant)
+        return {cle: tableau[ligne[0]] for cle, tableau in self._flux.items()}
+
+    @chronometre("portefeuille.projeter")
+    def projeter(self):
+        """Projection de la SARL sur l'horizon, à partir des totaux des lots."""
+        horizon, totaux = self.horizon, {cle: tableau.tolist() for cle, tableau in self._totaux.items()}
+        apports_annuels = np.bincount(self.annees_acquisition - 1, weights=self.apports, minlength=horizon)
+        nb_lots = np.cumsum(np.bincount(self.annees_acquisition - 1, minlength=horizon))
+        taux_imposition = self.tmi_pc / 100 + PRELEVEMENTS_SOCIAUX_REVENUS
+        taux_distrib = self.taux_distrib_pc / 100
+
+        colonnes = {colonne: np.zeros(horizon) for colonne in COLONNES_PROJECTION}
+        abondements = np.zeros(horizon)
+        flux_tri, cash_final_tri = np.zeros(horizon), np.zeros(horizon)
+        deficit_reportable = tresorerie = cashflow_accumule = abondement_cumule = apports_cumules = 0.0
+        for t in range(horizon):
+            loyer, charges_cash = totaux["loyer"][t], totaux["charges_cash"][t]
+            interets, principal, assurance = totaux["interet"][t], totaux["principal"][t], totaux["assurance"][t]
+            resultat_fiscal = loyer - charges_cash - interets - assurance - totaux["amortissement"][t]
+            benefice_imposable = max(0.0, resultat_fiscal - deficit_reportable)
+            deficit_consomme = min(deficit_reportable, max(0.0, resultat_fiscal))
+            deficit_reportable = deficit_reportable - deficit_consomme + abs(min(0.0, resultat_fiscal))
+            impot = benefice_imposable * taux_imposition
+
+            tresorerie_avant_distribution = tresorerie + loyer - charges_cash - (interets + principal + assurance)
+            abondement = abs(tresorerie_avant_distribution) if tresorerie_avant_distribution < 0 else 0.0
+            abondement_cumule += abondement
+            tresorerie = max(tresorerie_avant_distribution, 0.0)
+            dividendes_disponibles = max(0.0, resultat_fiscal)
+            dividendes_verses = min(dividendes_disponibles, tresorerie) * taux_distrib
+            tresorerie -= dividendes_verses
+
+            cashflow_net = dividendes_verses - impot - abondement
+            cashflow_accumule += cashflow_net
+            apports_cumules += apports_annuels[t]
+            cash_net_final = totaux["revente_nette"][t] + tresorerie
+            benefice_net_total = (cashflow_accumule - cashflow_net + cash_net_final) - (apports_cumules + abondement_cumule)
+
+            # Flux du TRI : les apports des lots acquis l'année suivante sont versés en fin d'année t,
+            # sauf en cas de revente à l'année t
+            apport_suivant = apports_annuels[t + 1] if t + 1 < horizon else 0.0
+            flux_tri[t], cash_final_tri[t] = cashflow_net - apport_suivant, cash_net_final + apport_suivant
+            abondements[t] = abondement
+            for colonne, valeur in (("Année", t + 1), ("Loyers Annuels", loyer), ("Résultat Fiscal", resultat_fiscal), ("Dividendes Disponibles", dividendes_disponibles),
+                                    ("Impôt (IR+PS)", impot), ("Cash-flow Net", cashflow_net), ("Tréso. SARL", tresorerie), ("PV Brute", totaux["pv_brute"][t]),
+                                    ("Impôt sur PV", totaux["impot_pv"][t]), ("Bénéfice Net Total", benefice_net_total)):
+                colonnes[colonne][t] = valeur
+
+        detenu = nb_lots > 0
+        resultat_tri = tri_sortie_annuelle(apports_annuels[:1], flux_tri[None, :], cash_final_tri[None, :], detenu[None, :])
+        colonnes["TRI (%)"] = resultat_tri.tri[0] * 100
+        return ProjectionPortefeuille(colonnes=colonnes, statut_tri=resultat_tri.statut[0], abondement=abondements, nb_lots=nb_lots)
@@ -0,0 +1,129 @@
+# moteur/pret.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from moteur.chrono import chronometre
+
+# --- MOTEUR DE PRÊT VECTORISÉ ---
+# Les échéanciers sont calculés en forme fermée (type npf.pmt) sur des tableaux
+# (prêts × mois) : un seul appel traite un prêt ou des milliers de variantes.
+# Un échéancier est découpé en segments à taux et à phase constants (différé,
+# amortissement, paliers de taux) ; la boucle Python ne porte que sur ces
+# quelques segments, jamais sur les mois.
+
+
+@dataclass(frozen=True)
+class Echeancier:
+    """Échéanciers mensuels de N prêts, en tableaux (N, M), M multiple de 12."""
+    interet: np.ndarray      # intérêts du mois (capitalisés pendant un différé total)
+    principal: np.ndarray    # capital remboursé du mois (négatif si intérêts capitalisés)
+    crd: np.ndarray          # capital restant dû en fin de mois
+    mensualite: np.ndarray   # échéance payée, hors assurance
+    nb_mois: np.ndarray      # (N,) durée de chaque prêt en mois
+
+    @property
+    def nb_annees(self):
+        return self.interet.shape[1] // 12
+
+    def annuel(self):
+        """Totaux annuels en tableaux (N, A) : 'interet', 'principal', 'crd_fin_annee'."""
+        forme = (self.interet.shape[0], self.nb_annees, 12)
+        crd_fin_annee = self.crd[:, 11::12]
+        return {
+            "interet": self.interet.reshape(forme).sum(axis=2),
+            "principal": self.principal.reshape(forme).sum(axis=2),
+            "crd_fin_annee": np.where(crd_fin_annee > 0.01, crd_fin_annee, 0.0),
+        }
+
+
+def _en_tableau(valeur, n):
+    return np.full(n, np.asarray(valeur, dtype=float))
+
+
+def _echeance_constante(capital, taux, nb_mois):
+    """Échéance constante remboursant `capital` en `nb_mois` au taux mensuel `taux` (formule de npf.pmt, sans ses conversions)."""
+    croissance = (1 + taux)**nb_mois
+    taux_nul = taux == 0
+    return capital * croissance / np.where(taux_nul, nb_mois, (croissance - 1) / np.where(taux_nul, 1, taux))
+
+
+@chronometre("pret.echeanciers")
+def calculer_echeanciers(montants, taux_annuels_pc, durees_annees, differe_mois=0, differe_total=False, paliers=()):
+    """Calcule les échéanciers mensuels d'un lot de prêts à échéances constantes.
+
+    Tous les arguments numériques acceptent un scalaire ou un tableau (N,).
+    `differe_mois` : mois de différé inclus dans la durée ; en différé partiel
+    seuls les intérêts sont payés, en différé total (`differe_total=True`) ils
+    sont capitalisés. `paliers` : suite de (mois_debut, taux_annuel_pc) ; à
+    partir du mois `mois_debut` (1 = premier mois) le taux change et
+    l'échéance est recalculée sur le capital et la durée restants.
+    """
+    n = np.broadcast(np.asarray(montants), np.asarray(taux_annuels_pc), np.asarray(durees_annees), np.asarray(differe_mois)).size
+    montants = _en_tableau(montants, n)
+    taux_mensuels = _en_tableau(taux_annuels_pc, n) / 100 / 12
+    nb_mois = np.maximum(np.trunc(_en_tableau(durees_annees, n) * 12), 0).astype(int)
+    differe = np.maximum(_en_tableau(differe_mois, n), 0).astype(int)
+    if np.any((differe > 0) & (differe >= nb_mois)):
+        raise ValueError("Le différé doit être strictement inférieur à la durée du prêt.")
+
+    paliers = sorted((int(mois_debut) - 1, _en_tableau(taux_pc, n) / 100 / 12) for mois_debut, taux_pc in paliers)
+    if any(debut < 0 for debut, _ in paliers):
+        raise ValueError("Un palier de taux commence au plus tôt au mois 1.")
+
+    nb_mois_total = -(-int(nb_mois.max(initial=0)) // 12) * 12
+    bornes = {0, nb_mois_total}
+    bornes.update(nb_mois.tolist())
+    bornes.update(differe.tolist())
+    bornes.update(debut for debut, _ in paliers)
+    bornes = sorted(b for b in bornes if 0 <= b <= nb_mois_total)
+
+    interet = np.zeros((n, nb_mois_total))
+    principal = np.zeros((n, nb_mois_total))
+    crd = np.zeros((n, nb_mois_total))
+    mensualite = np.zeros((n, nb_mois_total))
+
+    solde = montants.copy()
+    for debut, fin in zip(bornes[:-1], bornes[1:]):
+        taux = taux_mensuels
+        for debut_palier, taux_palier in paliers:
+            if debut_palier <= debut: taux = taux_palier
+
+        # Sur un segment, chaque prêt est soit entièrement actif, soit terminé
+        # (les fins de prêt font partie des bornes) : seuls les actifs sont calculés.
+        lignes = np.flatnonzero(nb_mois > debut)
+        if lignes.size == 0: break
+        taux, solde_lignes = taux[lignes], solde[lignes]
+        en_differe = debut < differe[lignes]
+        echeance = _echeance_constante(solde_lignes, taux, nb_mois[lignes] - debut)
+        if en_differe.any():
+            echeance = np.where(en_differe, 0.0 if differe_total else solde_lignes * taux, echeance)
+
+        # Solde avant la k-ième échéance du segment :
+        # S_k = S_0 (1+r)^k - E ((1+r)^k - 1) / r  (S_0 - E k si r = 0)
+        k = np.arange(fin - debut)
+        croissance = (1 + taux)[:, None] ** k
+        taux_nul = (taux == 0)[:, None]
+        cumul = np.where(taux_nul, k, (croissance - 1) / np.where(taux_nul, 1.0, taux[:, None]))
+        solde_debut = solde_lignes[:, None] * croissance - echeance[:, None] * cumul
+        interet_segment = solde_debut * taux[:, None]
+        principal_segment = echeance[:, None] - interet_segment
+
+        interet[lignes, debut:fin] = interet_segment
+        principal[lignes, debut:fin] = principal_segment
+        crd[lignes, debut:fin] = solde_debut - principal_segment
+        mensualite[lignes, debut:fin] = echeance[:, None]
+        solde[:] = 0.0
+        solde[lignes] = crd[lignes, fin - 1]
+
+    return Echeancier(interet=interet, principal=principal, crd=crd, mensualite=mensualite, nb_mois=nb_mois)
+
+
+# --- TABLEAU D'AMORTISSEMENT ANNUEL D'UN PRÊT (format dict, historique de app.py) ---
+@chronometre("pret.tableau_amortissement")
+def generer_tableau_amortissement(montant_pret, taux_annuel_pc, duree_annees):
+    if not (montant_pret > 0 and taux_annuel_pc > 0 and duree_annees > 0): return {}
+    tableau_annuel = calculer_echeanciers(montant_pret, taux_annuel_pc, duree_annees).annuel()
+    return {annee: {cle: float(valeurs[0, annee - 1]) for cle, valeurs in tableau_annuel.items()}
+            for annee in range(1, tableau_annuel['interet'].shape[1] + 1)}
@@ -0,0 +1,313 @@
+# moteur/projection.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from moteur.chrono import chronometre, etape
+from moteur.fiscalite import impot_plus_value
+from moteur.pret import calculer_echeanciers
+from moteur.tri import tri_sortie_annuelle
+
+# --- MOTEUR DE SIMULATION LMNP PAR LOTS ---
+# Modèle de la SARL de famille à l'IR pour N jeux de paramètres à la fois.
+# Les grandeurs qui ne dépendent pas de l'état de la SARL (loyers, charges,
+# amortissements, échéances, revente) sont calculées d'un bloc en tableaux
+# (N, années) ; seuls le déficit reportable et la trésorerie (avec les
+# abondements et dividendes) avancent année par année, en vecteurs (N,) ou,
+# pour quelques scénarios, en flottants Python : le cas N = 1 ne paie ainsi
+# qu'un nombre fixe d'appels NumPy, quelle que soit la durée.
+# generer_projection_lmnp en est la version « un scénario, liste de dicts ».
+
+COLONNES_PROJECTION = ("Année", "Loyers Annuels", "Résultat Fiscal", "Dividendes Disponibles", "Impôt (IR+PS)", "Cash-flow Net", "Tréso. SARL", "PV Brute", "Impôt sur PV", "Bénéfice Net Total", "TRI (%)")
+COLONNES_POST_CREDIT = ("Loyers Annuels", "Résultat Fiscal", "Dividendes Disponibles", "Impôt (IR+PS)", "Cash-flow Net", "Tréso. SARL")
+PRELEVEMENTS_SOCIAUX_REVENUS = 0.172  # PS sur revenus locatifs, fixes
+TAILLE_MAX_ETAT_SCALAIRE = 8  # scénarios au plus pour avancer l'état de la SARL en flottants Python
+PARAMETRES_SIMULATION = ("prix_achat", "cout_travaux", "valeur_meubles", "loyer_mensuel", "apport_personnel", "frais_notaire", "duree_pret",
+                         "taux_interet_pret", "taux_assurance_pret", "frais_dossier", "tmi_pc", "duree_amort_immo", "duree_amort_meubles",
+                         "taux_distrib_pc", "inflation_pc", "revalo_bien_pc", "charges_copro", "taxe_fonciere", "frais_gestion_pc",
+                         "taux_gli_pc", "assurance_pno", "cfe")
+
+
+@dataclass(frozen=True)
+class ProjectionLot:
+    """Résultat d'une projection par lots.
+
+    `colonnes` associe à chaque colonne de COLONNES_PROJECTION un tableau
+    (N, A), NaN au-delà de l'horizon du scénario (par défaut, la durée du
+    prêt ; au-delà du prêt, plus d'échéances ni de CRD) ; `post_credit` associe
+    à chaque colonne de COLONNES_POST_CREDIT un tableau (N,) pour l'année
+    suivant la fin du crédit. `statut_tri` (N, A) donne le statut du calcul de
+    TRI (codes de moteur.tri) ; « TRI (%) » vaut NaN s'il n'existe pas de TRI.
+    `abondement` (N, A) : apports des associés pour renflouer la trésorerie.
+    """
+    duree_pret: np.ndarray
+    horizon: np.ndarray
+    colonnes: dict
+    post_credit: dict
+    statut_tri: np.ndarray
+    abondement: np.ndarray
+
+    @property
+    def nb_scenarios(self):
+        return self.duree_pret.shape[0]
+
+    def a_l_annee(self, colonne, annee=None):
+        """Valeurs (N,) d'une colonne à l'année `annee`, bornée à l'horizon (par défaut, dernière année du prêt)."""
+        annees = self.duree_pret if annee is None else np.minimum(int(annee), self.horizon)
+        valeurs = np.full(self.nb_scenarios, np.nan)
+        lignes = np.flatnonzero(annees >= 1)
+        valeurs[lignes] = self.colonnes[colonne][lignes, annees[lignes] - 1]
+        return valeurs
+
+    def scenario(self, i):
+        """Résultat du scénario i au format de generer_projection_lmnp : (projection, projection_post_credit)."""
+        duree, horizon = int(self.duree_pret[i]), int(self.horizon[i])
+        valeurs = {colonne: self.colonnes[colonne][i, :horizon].tolist() for colonne in COLONNES_PROJECTION}
+        projection = [{colonne: valeurs[colonne][annee] for colonne in COLONNES_PROJECTION} for annee in range(horizon)]
+        for ligne in projection: ligne["Année"] = int(ligne["Année"])
+        projection_post_credit = {}
+        if duree > 0:
+            projection_post_credit = {"Année": f"An {duree + 1}"}
+            projection_post_credit.update({colonne: self.post_credit[colonne][i] for colonne in COLONNES_POST_CREDIT})
+            projection_post_credit.update({"PV Brute": "N/A", "Impôt sur PV": "N/A", "Bénéfice Net Total": "N/A", "TRI (%)": "N/A"})
+        return projection, projection_post_credit
+
+
+def lire_parametres(params_lot):
+    """Convertit un DataFrame ou un dict de scalaires/tableaux en dict de tableaux float (N,)."""
+    colonnes = {k: params_lot[k] for k in params_lot.keys()}
+    try: colonnes = {k: np.asarray(v, dtype=float) for k, v in colonnes.items()}
+    except (ValueError, TypeError): raise ValueError("Veuillez entrer des nombres valides.")
+    n = np.broadcast(*colonnes.values()).size if colonnes else 1
+    if any(v.ndim > 1 for v in colonnes.values()): raise ValueError("Les paramètres doivent être des scalaires ou des tableaux à une dimension.")
+    return {k: v if v.shape == (n,) else np.full(n, v) for k, v in colonnes.items()}, n
+
+
+def _trajectoire(trajectoires, cle, n, nb_colonnes):
+    """Trajectoire annuelle (N, nb_colonnes) ; la dernière année fournie est prolongée."""
+    if trajectoires is None or cle not in trajectoires: return None
+    trajectoire = np.asarray(trajectoires[cle], dtype=float)
+    trajectoire = np.broadcast_to(trajectoire if trajectoire.ndim == 2 else trajectoire[None, :], (n, trajectoire.shape[-1]))
+    if trajectoire.shape[1] >= nb_colonnes: return trajectoire[:, :nb_colonnes]
+    return np.pad(trajectoire, ((0, 0), (0, nb_colonnes - trajectoire.shape[1])), mode="edge")
+
+
+def _avancer_etat(resultats_fiscaux, cashflows_sarl, dividendes_disponibles, taux_distrib):
+    """Déficit reportable, trésorerie avant distribution et trésorerie SARL de fin d'année, en tableaux (N, A).
+
+    Seule récurrence du modèle. Pour quelques scénarios, elle avance en
+    flottants Python, un appel NumPy coûtant plus que le calcul ; sinon en
+    vecteurs (N,), année par année.
+    """
+    n, nb_annees = resultats_fiscaux.shape
+    if n <= TAILLE_MAX_ETAT_SCALAIRE:
+        etats = []
+        for resultats, cashflows, dividendes, taux in zip(resultats_fiscaux.tolist(), cashflows_sarl.tolist(), dividendes_disponibles.tolist(), taux_distrib.tolist()):
+            deficit = tresorerie = 0.0
+            for resultat, cashflow, dividende in zip(resultats, cashflows, dividendes):
+                # Déficit consommé par un résultat positif, augmenté d'un résultat négatif
+                deficit = max(deficit - resultat, 0.0)
+                avant_distribution = tresorerie + cashflow
+                apres_abondement = max(avant_distribution, 0.0)
+                tresorerie = apres_abondement - min(dividende, apres_abondement) * taux
+                etats.append((deficit, avant_distribution, tresorerie))
+        return np.array(etats, dtype=float).reshape(n, nb_annees, 3).transpose(2, 0, 1)
+
+    etats = np.empty((3, nb_annees, n))
+    resultats_fiscaux, cashflows_sarl, dividendes_disponibles = resultats_fiscaux.T.copy(), cashflows_sarl.T.copy(), dividendes_disponibles.T.copy()
+    deficit, tresorerie = np.zeros(n), np.zeros(n)
+    for j in range(nb_annees):
+        deficit = etats[0, j] = np.maximum(deficit - resultats_fiscaux[j], 0)
+        avant_distribution = etats[1, j] = tresorerie + cashflows_sarl[j]
+        apres_abondement = np.maximum(avant_distribution, 0)
+        tresorerie = etats[2, j] = apres_abondement - np.minimum(dividendes_disponibles[j], apres_abondement) * taux_distrib
+    return etats.transpose(0, 2, 1)
+
+
+@chronometre("projection.lot")
+def generer_projection_lmnp_lot(params_lot, cache=None, trajectoires=None, paliers_taux=(), horizon=None, annees_tri=None):
+    """Projection LMNP de N scénarios ; `params_lot` : DataFrame ou dict de scalaires/tableaux (N,).
+
+    `cache` (moteur.cache.CacheResultats, optionnel) sert à réutiliser les
+    tableaux d'amortissement déjà calculés pour les mêmes prêts.
+    `trajectoires` (optionnel) remplace des hypothèses fixes par des valeurs
+    année par année, en tableaux (N, A) ou (A,) : "inflation_pc" et
+    "revalo_bien_pc" (taux de l'année, en %), "mois_vacance" (mois sans loyer).
+    `paliers_taux` : révisions du taux du prêt, cf. moteur.pret.calculer_echeanciers.
+    `horizon` (optionnel) : nombre d'années projetées, entier ou tableau (N,),
+    au moins la durée du prêt ; les années suivantes continuent sans
+    échéances de crédit.
+    `annees_tri` (optionnel) : années de revente dont on calcule le TRI ; les
+    autres restent à NaN (statut TRI_AUCUN). Par défaut, toutes.
+    """
+    valeurs, n = lire_parametres(params_lot)
+    def valeur(cle, defaut): return valeurs[cle] if cle in valeurs else np.full(n, float(defaut))
+
+    # Initialisation
+    prix_achat, cout_travaux, frais_notaire = valeur("prix_achat", 0), valeur("cout_travaux", 0), valeur("frais_notaire", 0)
+    apport, frais_dossier = valeur("apport_personnel", 0), valeur("frais_dossier", 0)
+    montant_pret = prix_achat + cout_travaux + frais_notaire - apport
+    cout_acquisition = prix_achat + cout_travaux
+    base_acquisition_pv = prix_achat + cout_travaux + frais_notaire
+    investissement_initial_personnel = apport + frais_dossier # Frais de notaire sont dans le prêt
+    duree_pret = np.trunc(valeur("duree_pret", 0)).astype(int)
+    nb_annees_pret = int(duree_pret.max(initial=0))
+    horizon_scenarios = duree_pret if horizon is None else np.maximum(duree_pret, np.asarray(horizon).astype(int))
+    nb_annees = int(horizon_scenarios.max(initial=0))
+
+    taux_interet_pret = valeur("taux_interet_pret", 0)
+    pret_valide = (montant_pret > 0) & (taux_interet_pret > 0) & (duree_pret > 0)
+    def calculer_tableau_pret():
+        tableau_pret = {cle: np.zeros((n, nb_annees_pret)) for cle in ("interet", "principal", "crd_fin_annee")}
+        if pret_valide.any():
+            paliers = [(mois_debut, np.broadcast_to(taux_pc, (n,))[pret_valide]) for mois_debut, taux_pc in paliers_taux]
+            annuel = calculer_echeanciers(montant_pret[pret_valide], taux_interet_pret[pret_valide], duree_pret[pret_valide], paliers=paliers).annuel()
+            for cle, tableau in annuel.items(): tableau_pret[cle][pret_valide, :tableau.shape[1]] = tableau
+        return tableau_pret
+    if cache is None: tableau_pret = calculer_tableau_pret()
+    else:
+        cle_pret = {"montant_pret": montant_pret, "taux_interet_pret": taux_interet_pret, "duree_pret": duree_pret}
+        cle_pret.update({f"palier_{mois_debut}": taux_pc for mois_debut, taux_pc in paliers_taux})
+        tableau_pret = cache.obtenir("pret", cle_pret, calculer_tableau_pret)
+    if nb_annees > nb_annees_pret: tableau_pret = {cle: np.pad(tableau, ((0, 0), (0, nb_annees - nb_annees_pret))) for cle, tableau in tableau_pret.items()}
+    mensualite_assurance_base = (montant_pret * (valeur("taux_assurance_pret", 0) / 100)) / 12
+
+    loyer_mensuel_base, charges_copro_base, taxe_fonciere_base = valeur("loyer_mensuel", 0), valeur("charges_copro", 0), valeur("taxe_fonciere", 0)
+    inflation_pc, revalo_bien_pc = valeur("inflation_pc", 0) / 100, valeur("revalo_bien_pc", 0) / 100
+    tmi_pc, prelevements_sociaux_pc = valeur("tmi_pc", 0) / 100, PRELEVEMENTS_SOCIAUX_REVENUS
+    frais_gestion_pc, taux_gli_pc = valeur("frais_gestion_pc", 0) / 100, valeur("taux_gli_pc", 0) / 100
+    assurance_pno, cfe = valeur("assurance_pno", 0), valeur("cfe", 0)
+    taux_distrib = valeur("taux_distrib_pc", 100) / 100
+    seuil_amort_immo, diviseur_amort_immo = valeur("duree_amort_immo", 0), valeur("duree_amort_immo", 1)
+    seuil_amort_meubles, diviseur_amort_meubles = valeur("duree_amort_meubles", 0), valeur("duree_amort_meubles", 1)
+    valeur_meubles = valeur("valeur_meubles", 0)
+
+    # Hypothèses année par année : facteurs cumulés, colonne j = année j + 1
+    annees = np.arange(1, nb_annees + 2)  # années de crédit ou d'horizon, puis année post-crédit
+    inflation_annuelle = _trajectoire(trajectoires, "inflation_pc", n, nb_annees + 1)
+    if inflation_annuelle is not None:
+        facteurs_inflation = np.cumprod(np.concatenate((np.ones((n, 1)), 1 + inflation_annuelle[:, :-1] / 100), axis=1), axis=1)
+    else: facteurs_inflation = (1 + inflation_pc)[:, None]**(annees - 1)
+    revalo_annuelle = _trajectoire(trajectoires, "revalo_bien_pc", n, nb_annees)
+    if revalo_annuelle is not None: facteurs_revalo = np.cumprod(1 + revalo_annuelle / 100, axis=1)
+    else: facteurs_revalo = (1 + revalo_bien_pc)[:, None]**annees[:nb_annees]
+    mois_vacance = _trajectoire(trajectoires, "mois_vacance", n, nb_annees + 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"), etape("projection.boucle_annuelle"):
+        # Grandeurs indépendantes de l'état de la SARL, d'un bloc en tableaux (N, A + 1)
+        loyer_annuel = (loyer_mensuel_base * 12)[:, None] * facteurs_inflation
+        if mois_vacance is not None: loyer_annuel = loyer_annuel * (12 - np.clip(mois_vacance, 0, 12)) / 12
+        charges_copro_annuelles = (charges_copro_base * 12)[:, None] * facteurs_inflation
+        taxe_fonciere_actuelle = taxe_fonciere_base[:, None] * facteurs_inflation
+        frais_gestion_annuels = loyer_annuel * frais_gestion_pc[:, None]
+        gli_annuelle = (loyer_annuel + charges_copro_annuelles) * taux_gli_pc[:, None]
+        charges_annuelles_cash = (charges_copro_annuelles + taxe_fonciere_actuelle +
+            assurance_pno[:, None] + frais_gestion_annuels + gli_annuelle + (cfe[:, None] * facteurs_inflation))
+
+        amort_immo = np.where(annees <= seuil_amort_immo[:, None], ((prix_achat + frais_notaire) * 0.85 / diviseur_amort_immo)[:, None], 0)
+        amort_travaux = np.where(annees <= 10, (cout_travaux / 10)[:, None], 0)
+        amort_meubles = np.where(annees <= seuil_amort_meubles[:, None], (valeur_meubles / diviseur_amort_meubles)[:, None], 0)
+        amortissement_annuel = amort_immo + amort_travaux + amort_meubles
+
+        # Années de crédit ou d'horizon, tableaux (N, A)
+        actif = annees[:nb_annees] <= horizon_scenarios[:, None]
+        loyers = loyer_annuel[:, :nb_annees]
+        charges_cash = charges_annuelles_cash[:, :nb_annees].copy()
+        charges_cash[:, :1] += frais_dossier[:, None]
+        interets_annuels = tableau_pret["interet"]
+        assurance_annuelle = np.where(annees[:nb_annees] <= duree_pret[:, None], (mensualite_assurance_base * 12)[:, None], 0)
+        charges_annuelles_deductibles = charges_cash + interets_annuels + assurance_annuelle
+        resultat_fiscal_avant_deficit = loyers - charges_annuelles_deductibles - amortissement_annuel[:, :nb_annees]
+        dividendes_disponibles = np.maximum(0, resultat_fiscal_avant_deficit)
+        mensualite_credit_annuelle = interets_annuels + tableau_pret["principal"] + assurance_annuelle
+        cashflow_sarl_avant_operations = loyers - charges_cash - mensualite_credit_annuelle
+
+        # État de fin d'année : seuls le déficit reportable et la trésorerie avancent année par année.
+        # Au-delà de l'horizon d'un scénario, les valeurs calculées ne sont pas lues.
+        deficits_reportables, tresoreries_avant_distribution, tresoreries_sarl = _avancer_etat(resultat_fiscal_avant_deficit, cashflow_sarl_avant_operations, dividendes_disponibles, taux_distrib)
+
+        deficits_debut = np.concatenate((np.zeros((n, 1)), deficits_reportables[:, :-1]), axis=1)
+        benefice_imposable = np.maximum(0, resultat_fiscal_avant_deficit - deficits_debut)
+        abondements_annuels = np.maximum(-tresoreries_avant_distribution, 0)
+        tresorerie_apres_abondement = np.maximum(tresoreries_avant_distribution, 0)
+        dividendes_verses = np.minimum(dividendes_disponibles, tresorerie_apres_abondement) * taux_distrib[:, None]
+
+        impot_total_annuel = benefice_imposable * (tmi_pc + prelevements_sociaux_pc)[:, None]
+        flux_tresorerie_tri_annuels = dividendes_verses - impot_total_annuel - abondements_annuels
+        cashflow_investisseur_accumule = np.cumsum(flux_tresorerie_tri_annuels, axis=1)
+        abondement_cumule = np.cumsum(abondements_annuels, axis=1)
+        abondements_annuels = np.where(actif, abondements_annuels, 0)
+
+        prix_revente = cout_acquisition[:, None] * facteurs_revalo
+        plus_value_brute = prix_revente - base_acquisition_pv[:, None]
+        impot_sur_pv = impot_plus_value(plus_value_brute, annees[:nb_annees])
+        cash_net_apres_revente = prix_revente - tableau_pret["crd_fin_annee"] - impot_sur_pv
+        cash_final_tri_annuels = cash_net_apres_revente + tresoreries_sarl
+        total_cash_investi = investissement_initial_personnel[:, None] + abondement_cumule
+        total_cash_recu = cashflow_investisseur_accumule - flux_tresorerie_tri_annuels + cash_final_tri_annuels
+        benefice_net_total = total_cash_recu - total_cash_investi
+
+        colonnes = {}
+        for colonne, valeurs_annees in (("Année", annees[:nb_annees].astype(float)), ("Loyers Annuels", loyers), ("Résultat Fiscal", resultat_fiscal_avant_deficit),
+                                        ("Dividendes Disponibles", dividendes_disponibles), ("Impôt (IR+PS)", impot_total_annuel), ("Cash-flow Net", flux_tresorerie_tri_annuels),
+                                        ("Tréso. SARL", tresoreries_sarl), ("PV Brute", plus_value_brute), ("Impôt sur PV", impot_sur_pv),
+                                        ("Bénéfice Net Total", benefice_net_total)):
+            colonnes[colonne] = np.where(actif, valeurs_annees, np.nan)
+
+        # Section post-crédit : année qui suit la fin du prêt, à partir de l'état de fin de prêt
+        post_credit = {colonne: np.full(n, np.nan) for colonne in COLONNES_POST_CREDIT}
+        lignes = np.flatnonzero(duree_pret > 0)
+        if lignes.size:
+            annee_post, fin_pret = duree_pret[lignes], duree_pret[lignes] - 1  # indices de colonne
+            loyer_post, charges_post = loyer_annuel[lignes, annee_post], charges_annuelles_cash[lignes, annee_post]
+            resultat_fiscal = loyer_post - charges_post - amortissement_annuel[lignes, annee_post]
+            benefice_imposable_post = np.maximum(0, resultat_fiscal - deficits_reportables[lignes, fin_pret]); impot_post = benefice_imposable_post * (tmi_pc + prelevements_sociaux_pc)[lignes]
+            cashflow_sarl_post_credit = loyer_post - charges_post
+            tresorerie_post_credit = tresoreries_sarl[lignes, fin_pret] + cashflow_sarl_post_credit
+            dividendes_disponibles_post = np.maximum(0, resultat_fiscal)
+            dividendes_verses_post = np.minimum(dividendes_disponibles_post, tresorerie_post_credit) * taux_distrib[lignes]
+            for colonne, valeurs_post in (("Loyers Annuels", loyer_post), ("Résultat Fiscal", resultat_fiscal), ("Dividendes Disponibles", dividendes_disponibles_post),
+                                         ("Impôt (IR+PS)", impot_post), ("Cash-flow Net", dividendes_verses_post - impot_post),
+                                         ("Tréso. SARL", tresorerie_post_credit - dividendes_verses_post)):
+                post_credit[colonne][lignes] = valeurs_post
+
+    # TRI de chaque année de revente, toutes années confondues en une passe
+    actif_tri = actif if annees_tri is None else actif & np.isin(annees[:nb_annees], np.asarray(annees_tri, dtype=int))
+    resultat_tri = tri_sortie_annuelle(investissement_initial_personnel, flux_tresorerie_tri_annuels, cash_final_tri_annuels, actif_tri)
+    colonnes["TRI (%)"] = resultat_tri.tri * 100
+
+    return ProjectionLot(duree_pret=duree_pret, horizon=horizon_scenarios, colonnes=colonnes, post_credit=post_credit, statut_tri=resultat_tri.statut, abondement=abondements_annuels)
+
+
+@chronometre("projection.scenario")
+def generer_projection_lmnp(params):
+    try: return generer_projection_lmnp_lot({k: [v] for k, v in params.items()}).scenario(0)
+    except ValueError: return [{"erreur": "Veuillez entrer des nombres valides."}]
+
+
+def indicateurs_projection(lot, annee=None):
+    """Indicateurs de synthèse (N,) d'une projection : revente à l'année `annee` (par défaut, fin du prêt).
+
+    Les agrégats (cash-flow minimal et cumulé, abondements) portent sur les
+    années 1 à la revente, quel que soit l'horizon projeté.
+    """
+    annees = lot.duree_pret if annee is None else np.minimum(int(annee), lot.horizon)
+    statut_tri = np.full(lot.nb_scenarios, -1, dtype=np.int8)
+    lignes = np.flatnonzero(annees >= 1)
+    statut_tri[lignes] = lot.statut_tri[lignes, annees[lignes] - 1]
+    # Agrégats limités aux années de détention, jusqu'à la revente incluse
+    detention = np.arange(1, lot.abondement.shape[1] + 1) <= annees[:, None]
+    cashflows = np.where(detention, lot.colonnes["Cash-flow Net"], np.nan)
+    cashflow_min = np.where(np.isnan(cashflows), np.inf, cashflows).min(axis=1, initial=np.inf)
+    return {
+        "Année de revente": annees,
+        "TRI (%)": lot.a_l_annee("TRI (%)", annee),
+        "Statut TRI": statut_tri,
+        "Bénéfice Net Total": lot.a_l_annee("Bénéfice Net Total", annee),
+        "Cash-flow An 1": lot.a_l_annee("Cash-flow Net", 1),
+        "Cash-flow Min": np.where(np.isinf(cashflow_min), np.nan, cashflow_min),
+        "Cash-flow Cumulé": np.nansum(cashflows, axis=1),
+        "Abondement Total": np.where(detention, lot.abondement, 0).sum(axis=1),
+        "Tréso. SARL Fin": lot.a_l_annee("Tréso. SARL", annee),
+    }
@@ -0,0 +1,86 @@
+# moteur/sensibilite.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from moteur.chrono import chronometre
+from moteur.projection import PARAMETRES_SIMULATION, generer_projection_lmnp_lot, indicateurs_projection, lire_parametres
+
+# --- ANALYSES DE SENSIBILITÉ ---
+# - Carte 2D : un indicateur (TRI ou bénéfice net à l'année N, ...) sur une
+#   grille de deux paramètres, calculée par blocs de points passés au moteur par
+#   lots ; le générateur rend la grille après chaque bloc pour un affichage
+#   progressif.
+# - Tornade : variation de l'indicateur quand chaque paramètre bouge seul de
+#   ± x %, tous les paramètres en un seul lot.
+# Le TRI n'est calculé que pour l'année de revente demandée.
+
+TAILLE_BLOC_GRILLE = 5000
+TAILLE_MAX_GRILLE = 200
+PARAMETRES_ENTIERS = ("duree_pret", "duree_amort_immo", "duree_amort_meubles")
+
+
+def _arrondir(variable, valeurs):
+    return np.round(valeurs) if variable in PARAMETRES_ENTIERS else valeurs
+
+
+@chronometre("sensibilite.evaluer_indicateur")
+def evaluer_indicateur(params_lot, indicateur, annee=None):
+    """Valeurs (N,) d'un indicateur de indicateurs_projection pour un lot, revente à l'année `annee` (par défaut, fin du prêt)."""
+    valeurs, n = lire_parametres(params_lot)
+    if annee is None: annees_tri = np.unique(np.trunc(valeurs.get("duree_pret", np.zeros(n))).astype(int))
+    else: annees_tri = [int(annee)]
+    lot = generer_projection_lmnp_lot(valeurs, horizon=annee, annees_tri=annees_tri if indicateur == "TRI (%)" else ())
+    return indicateurs_projection(lot, annee)[indicateur]
+
+
+def carte_sensibilite(params, variable_x, valeurs_x, variable_y, valeurs_y, indicateur="TRI (%)", annee=None, taille_bloc=TAILLE_BLOC_GRILLE):
+    """Générateur : (part calculée, grille (len(valeurs_y), len(valeurs_x))) après chaque bloc, NaN pour les points restants."""
+    for variable in (variable_x, variable_y):
+        if variable not in PARAMETRES_SIMULATION: raise ValueError(f"Paramètre inconnu : {variable}")
+    if variable_x == variable_y: raise ValueError("Les deux paramètres de la carte doivent être différents.")
+    valeurs_x, valeurs_y = _arrondir(variable_x, np.asarray(valeurs_x, dtype=float)), _arrondir(variable_y, np.asarray(valeurs_y, dtype=float))
+    if max(valeurs_x.size, valeurs_y.size) > TAILLE_MAX_GRILLE: raise ValueError(f"La grille est limitée à {TAILLE_MAX_GRILLE} valeurs par paramètre.")
+    grille = np.full((valeurs_y.size, valeurs_x.size), np.nan)
+    plate = grille.reshape(-1)
+    for debut in range(0, plate.size, taille_bloc):
+        indices = np.arange(debut, min(debut + taille_bloc, plate.size))
+        colonnes = {cle: np.full(indices.size, float(valeur)) for cle, valeur in params.items()}
+        colonnes[variable_x], colonnes[variable_y] = valeurs_x[indices % valeurs_x.size], valeurs_y[indices // valeurs_x.size]
+        plate[indices] = evaluer_indicateur(colonnes, indicateur, annee)
+        yield (indices[-1] + 1) / plate.size, grille
+
+
+@dataclass(frozen=True)
+class Tornade:
+    """Sensibilités un paramètre à la fois, triées par amplitude décroissante.
+
+    `valeurs_basses` / `valeurs_hautes` : paramètre à -x % / +x % ;
+    `indicateur_bas` / `indicateur_haut` : indicateur correspondant ;
+    `reference` : indicateur avec les paramètres saisis.
+    """
+    reference: float
+    variables: tuple
+    valeurs_basses: np.ndarray
+    valeurs_hautes: np.ndarray
+    indicateur_bas: np.ndarray
+    indicateur_haut: np.ndarray
+
+
+@chronometre("sensibilite.tornade")
+def tornade(params, indicateur="TRI (%)", annee=None, variation_pc=10.0, variables=None):
+    """Indicateur quand chaque paramètre (non nul) varie seul de ± `variation_pc` %, en un seul lot."""
+    variables = tuple(v for v in (variables or PARAMETRES_SIMULATION) if float(params.get(v, 0)) != 0)
+    nb = len(variables)
+    colonnes = {cle: np.full(2 * nb + 1, float(valeur)) for cle, valeur in params.items()}
+    valeurs_basses, valeurs_hautes = np.empty(nb), np.empty(nb)
+    for i, variable in enumerate(variables):
+        valeur = float(params[variable])
+        valeurs_basses[i], valeurs_hautes[i] = _arrondir(variable, np.array([valeur * (1 - variation_pc / 100), valeur * (1 + variation_pc / 100)]))
+        colonnes[variable][2 * i], colonnes[variable][2 * i + 1] = valeurs_basses[i], valeurs_hautes[i]
+    resultats = evaluer_indicateur(colonnes, indicateur, annee)
+    indicateur_bas, indicateur_haut = resultats[0:-1:2], resultats[1:-1:2]
+    ordre = np.argsort(-np.nan_to_num(np.abs(indicateur_haut - indicateur_bas), nan=-1), kind="stable")
+    return Tornade(reference=float(resultats[-1]), variables=tuple(variables[i] for i in ordre), valeurs_basses=valeurs_basses[ordre],
+                   valeurs_hautes=valeurs_hautes[ordre], indicateur_bas=indicateur_bas[ordre], indicateur_haut=indicateur_haut[ordre])
@@ -0,0 +1,58 @@
+# moteur/sortie.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from moteur.chrono import chronometre
+from moteur.projection import ProjectionLot, generer_projection_lmnp_lot
+from moteur.tri import TRI_OK
+
+# --- ANALYSE DE L'ANNÉE DE REVENTE ---
+# Une seule projection jusqu'à l'horizon (au-delà de la fin du prêt) donne, pour
+# chaque année de détention, le TRI et le bénéfice net d'une revente cette
+# année-là ; on en retient la meilleure année selon chacun des deux critères.
+# Les seuils d'exonération de la plus-value (22 ans pour l'IR, 30 ans pour les
+# PS) font souvent apparaître l'optimum au-delà de la durée du prêt.
+
+HORIZON_SORTIE = 35
+
+
+@dataclass(frozen=True)
+class AnalyseSortie:
+    """Meilleure année de revente de N scénarios, en tableaux (N,).
+
+    `annee_tri_max` / `tri_max` : année et TRI (%) maximal parmi les années où
+    le TRI est unique (statut TRI_OK) ; `annee_benefice_max` / `benefice_max` :
+    année et bénéfice net total maximal. L'année vaut 0 (et la valeur NaN)
+    quand aucune année ne convient. `lot` : projection complète jusqu'à l'horizon.
+    """
+    lot: ProjectionLot
+    annee_tri_max: np.ndarray
+    tri_max: np.ndarray
+    annee_benefice_max: np.ndarray
+    benefice_max: np.ndarray
+
+    @property
+    def annees(self):
+        return np.arange(1, self.lot.colonnes["Année"].shape[1] + 1)
+
+
+def _meilleure_annee(valeurs):
+    """Année (1-indexée, 0 si aucune) et valeur du maximum de chaque ligne, NaN ignorés."""
+    valides = ~np.isnan(valeurs)
+    indices = np.where(valides, valeurs, -np.inf).argmax(axis=1) if valeurs.shape[1] else np.zeros(valeurs.shape[0], dtype=int)
+    trouve = valides.any(axis=1)
+    maximum = np.full(valeurs.shape[0], np.nan)
+    maximum[trouve] = valeurs[np.flatnonzero(trouve), indices[trouve]]
+    return np.where(trouve, indices + 1, 0), maximum
+
+
+@chronometre("sortie")
+def analyser_sortie(params_lot, horizon=HORIZON_SORTIE, cache=None, trajectoires=None, paliers_taux=()):
+    """Meilleure année de revente, par TRI et par bénéfice net, de 1 à `horizon` ans (au moins la durée du prêt)."""
+    lot = generer_projection_lmnp_lot(params_lot, cache=cache, trajectoires=trajectoires, paliers_taux=paliers_taux, horizon=horizon)
+    tri = np.where(lot.statut_tri == TRI_OK, lot.colonnes["TRI (%)"], np.nan)
+    annee_tri_max, tri_max = _meilleure_annee(tri)
+    annee_benefice_max, benefice_max = _meilleure_annee(lot.colonnes["Bénéfice Net Total"])
+    return AnalyseSortie(lot=lot, annee_tri_max=annee_tri_max, tri_max=tri_max, annee_benefice_max=annee_benefice_max, benefice_max=benefice_max)
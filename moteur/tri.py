@@ -0,0 +1,243 @@
+# moteur/tri.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from moteur.chrono import chronometre
+
+# --- TRI « REVENTE À L'ANNÉE K » POUR TOUTES LES ANNÉES EN UNE PASSE ---
+# Pour l'année k, les flux sont : -investissement, f_1, ..., f_(k-1), f_k + V_k
+# (V_k : cash net de revente à l'année k). On cherche v = 1 / (1 + TRI) > 0,
+# racine du polynôme P_k(v) = somme c_t v^t.
+# - La règle des signes de Descartes donne le nombre de racines v > 0 possibles :
+#   0 changement de signe => aucun TRI, 1 changement => TRI unique.
+# - Cas unique (le cas courant) : Newton protégé par un encadrement, vectorisé
+#   sur les scénarios et démarré sur la solution de l'année précédente.
+# - Plusieurs changements de signe : les sommes cumulées des flux (dans les deux
+#   sens) bornent le nombre de racines sur v < 1 et v > 1 (critère de Norstrom) ;
+#   si cette borne vaut 1, le TRI est unique et Newton s'applique.
+# - Sinon, ou si Newton échoue : racines du polynôme (comme npf.irr) pour les
+#   seules lignes concernées, afin de compter les TRI.
+# Pour un petit nombre de scénarios, le coût vient des appels NumPy et non du
+# calcul : toutes les années sont alors résolues en un seul lot de polynômes
+# complétés par des zéros. Faute de solution de l'année précédente, Newton y
+# part du taux qui rembourse l'investissement par la somme des flux versée à
+# leur date moyenne.
+
+TRI_OK, TRI_AUCUN, TRI_MULTIPLE, TRI_NON_CONVERGE = 0, 1, 2, 3
+LIBELLES_STATUT_TRI = {TRI_OK: "ok", TRI_AUCUN: "aucun TRI", TRI_MULTIPLE: "TRI multiples", TRI_NON_CONVERGE: "non convergé"}
+
+TOLERANCE = 1e-13
+ITERATIONS_MAX = 100
+TAILLE_MAX_TOUTES_ANNEES = 2**18  # N * K * (K + 1) maximal pour résoudre toutes les années en un lot
+COLONNES_MAX_PUISSANCES = 512  # au-delà, P(v) est évalué par Horner
+
+
+@dataclass(frozen=True)
+class ResultatTRI:
+    """TRI (en fraction, pas en %) et statut, en tableaux (N, K).
+
+    `tri` vaut NaN quand le statut est TRI_AUCUN ou TRI_NON_CONVERGE ; avec
+    TRI_MULTIPLE, il contient la racine la plus proche de 0 (choix de npf.irr).
+    """
+    tri: np.ndarray
+    statut: np.ndarray
+
+
+def _signe_dernier_non_nul(signe_precedent, valeurs):
+    signe = np.sign(valeurs)
+    return np.where(signe != 0, signe, signe_precedent)
+
+
+def _changements_de_signe(matrice):
+    """Nombre de changements de signe (zéros ignorés) de chaque ligne."""
+    changements = np.zeros(matrice.shape[0], dtype=int)
+    signe_precedent = np.zeros(matrice.shape[0])
+    for colonne in matrice.T:
+        signe = np.sign(colonne)
+        changements += (signe != 0) & (signe_precedent != 0) & (signe != signe_precedent)
+        signe_precedent = _signe_dernier_non_nul(signe_precedent, colonne)
+    return changements
+
+
+def _borne_norstrom(coefs):
+    """Majorant du nombre de racines v > 0 : racines dans (0, 1), en 1, et au-delà de 1."""
+    cumul_direct = np.cumsum(coefs, axis=1)
+    cumul_inverse = np.cumsum(coefs[:, ::-1], axis=1)
+    return _changements_de_signe(cumul_direct) + _changements_de_signe(cumul_inverse) + (cumul_direct[:, -1] == 0)
+
+
+def _evaluer(coefs, pile, v):
+    """P(v) et P'(v) ; coefs (k+1, n), ligne t = coefficient de degré t.
+
+    Jusqu'à COLONNES_MAX_PUISSANCES colonnes, `pile` (2, k+1, n) empile coefs
+    et les coefficients de P' (ligne t = (t + 1) c_(t+1)) : puissances de v puis
+    un seul produit, en quelques appels NumPy quel que soit k. Au-delà (pile
+    None), Horner en place, qui reste en cache.
+    """
+    if pile is not None:
+        p, dp = np.einsum("stn,tn->sn", pile, v ** np.arange(coefs.shape[0])[:, None])
+        return p, dp
+    p = coefs[-1].copy()
+    dp = np.zeros_like(p)
+    for t in range(coefs.shape[0] - 2, -1, -1):
+        dp *= v; dp += p
+        p *= v; p += coefs[t]
+    return p, dp
+
+
+def _newton_encadre(coefs, v_depart):
+    """Racine v > 0 de chaque colonne de coefs (k+1, n), supposée unique.
+
+    P(0) = c_0 et P change de signe une seule fois sur ]0, +inf[ : chaque
+    évaluation resserre l'encadrement [bas, haut] ; un pas de Newton qui en
+    sort est remplacé par le milieu de l'encadrement, sans dépasser le double
+    de v (doublement tant que haut est infini). Renvoie (v, convergé).
+    """
+    n = coefs.shape[1]
+    v, converge = np.array(v_depart, dtype=float), np.zeros(n, dtype=bool)
+    # Les colonnes convergées sont figées ; dans un grand lot, elles sont
+    # retirées dès que la moitié d'entre elles a convergé.
+    lignes, c, pile, vl = np.arange(n), coefs, None, v.copy()
+    bas, haut, signe_bas = np.zeros(n), np.full(n, np.inf), np.sign(coefs[0])
+    en_cours = np.ones(n, dtype=bool)
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):  # doublements de v vers de très grandes valeurs
+        for _ in range(ITERATIONS_MAX):
+            if pile is None and c.shape[1] <= COLONNES_MAX_PUISSANCES:
+                pile = np.zeros((2,) + c.shape)
+                pile[0], pile[1, :-1] = c, c[1:] * np.arange(1, c.shape[0])[:, None]
+            p, dp = _evaluer(c, pile, vl)
+            meme_signe_que_bas = p * signe_bas > 0
+            bas = np.where(meme_signe_que_bas, vl, bas)
+            haut = np.where(meme_signe_que_bas, haut, vl)
+            v_suivant = vl - p / dp
+            v_suivant = np.where((v_suivant >= bas) & (v_suivant <= haut), v_suivant, np.minimum(2 * vl, (bas + haut) / 2))
+            # P(v) = 0 donne un pas nul (haut = v) ; le pas reste dans l'encadrement,
+            # dont le resserrement arrête donc aussi la boucle.
+            fini = np.abs(v_suivant - vl) <= TOLERANCE * np.maximum(vl, 1.0)
+            vl = np.where(en_cours, v_suivant, vl)
+            en_cours &= ~fini
+            restants = np.count_nonzero(en_cours)
+            if not restants: break
+            if c.shape[1] > COLONNES_MAX_PUISSANCES and 2 * restants < en_cours.size:
+                v[lignes[~en_cours]], converge[lignes[~en_cours]] = vl[~en_cours], True
+                lignes, c, vl, bas, haut, signe_bas = lignes[en_cours], c[:, en_cours], vl[en_cours], bas[en_cours], haut[en_cours], signe_bas[en_cours]
+                en_cours = np.ones(lignes.size, dtype=bool)
+    v[lignes], converge[lignes] = vl, ~en_cours
+    return v, converge
+
+
+def _depart_flux_regroupes(coefs):
+    """v > 0 tel que -c_0 = S v^D, S étant la somme des flux suivants et D leur date moyenne ; 1 / 1.05 à défaut."""
+    degres = np.arange(1, coefs.shape[0])[:, None]
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        somme = coefs[1:].sum(axis=0)
+        v = (-coefs[0] / somme) ** (somme / (degres * coefs[1:]).sum(axis=0))
+    return np.where(np.isfinite(v) & (v > 0), v, 1 / 1.05)
+
+
+def _racines_positives(coefs_ligne):
+    """Racines réelles v > 0 d'un vecteur de coefficients (du degré 0 au degré k)."""
+    coefs_ligne = np.trim_zeros(coefs_ligne, "b")
+    if coefs_ligne.size < 2: return np.empty(0)
+    racines = np.roots(coefs_ligne[::-1])
+    reelles = racines[np.abs(racines.imag) <= 1e-10 * np.maximum(np.abs(racines.real), 1.0)].real
+    reelles = np.unique(reelles[reelles > 0])
+    if reelles.size > 1:
+        distinctes = np.diff(reelles) > 1e-9 * reelles[1:]
+        reelles = reelles[np.concatenate(([True], distinctes))]
+    return reelles
+
+
+def _changements_par_annee(investissement_initial, flux_annuels, valeurs_finales):
+    """Changements de signe (N, K) de -investissement, f_1, ..., f_(k-1), f_k + V_k pour chaque année k."""
+    n, nb_annees = flux_annuels.shape
+    prefixe = np.empty((n, nb_annees), dtype=np.int8)  # signes de c_0 .. c_(K-1)
+    prefixe[:, 0] = np.sign(-investissement_initial)
+    prefixe[:, 1:] = np.sign(flux_annuels[:, :-1])
+    # Signe du dernier terme non nul de c_0 .. c_t (0 s'il n'y en a pas)
+    derniers = np.where(prefixe != 0, np.arange(nb_annees, dtype=np.int32), 0)
+    np.maximum.accumulate(derniers, axis=1, out=derniers)
+    signe_dernier = np.take_along_axis(prefixe, derniers, axis=1)
+    changements = np.zeros((n, nb_annees), dtype=np.int32)
+    np.cumsum((prefixe[:, 1:] != 0) & (prefixe[:, 1:] == -signe_dernier[:, :-1]), axis=1, out=changements[:, 1:])
+    signe_final = np.sign(flux_annuels + valeurs_finales).astype(np.int8)
+    changements += (signe_final != 0) & (signe_final == -signe_dernier)
+    return changements
+
+
+def _resoudre(coefs, colonnes, changements, v_depart):
+    """TRI et statut (m,) des colonnes `colonnes` de coefs (k+1, M), qui présentent au moins un changement de signe."""
+    tri = np.full(colonnes.size, np.nan)
+    statut = np.full(colonnes.size, TRI_AUCUN, dtype=np.int8)
+    c_0 = coefs[0, colonnes]
+    uniques = np.flatnonzero((changements == 1) & (c_0 != 0))
+    difficiles = np.flatnonzero((changements > 1) | (c_0 == 0))
+    if difficiles.size:
+        # Le nombre de racines a la parité du nombre de changements de signe.
+        borne = _borne_norstrom(coefs[:, colonnes[difficiles]].T)
+        impair = changements[difficiles] % 2 == 1
+        tranches = (borne <= 1) & (c_0[difficiles] != 0)
+        uniques = np.concatenate((uniques, difficiles[tranches & impair]))
+        difficiles = difficiles[~tranches]
+    if uniques.size:
+        v, converge = _newton_encadre(coefs[:, colonnes[uniques]], v_depart[uniques])
+        tri[uniques[converge]] = 1 / v[converge] - 1
+        statut[uniques[converge]] = TRI_OK
+        difficiles = np.concatenate((difficiles, uniques[~converge]))
+    for i in difficiles:
+        racines = _racines_positives(coefs[:, colonnes[i]])
+        if racines.size == 0:
+            statut[i] = TRI_AUCUN if changements[i] != 1 else TRI_NON_CONVERGE
+            continue
+        taux = 1 / racines - 1
+        tri[i] = taux[np.argmin(np.abs(taux))]
+        statut[i] = TRI_OK if racines.size == 1 else TRI_MULTIPLE
+    return tri, statut
+
+
+@chronometre("tri.sortie_annuelle")
+def tri_sortie_annuelle(investissement_initial, flux_annuels, valeurs_finales, actif=None):
+    """TRI d'une revente à chaque année k, pour N scénarios.
+
+    `investissement_initial` : (N,) ; `flux_annuels` : (N, K) flux nets de
+    l'investisseur ; `valeurs_finales` : (N, K) cash net perçu en cas de
+    revente à l'année k ; `actif` : (N, K) booléens, False pour les années à
+    ignorer (statut TRI_AUCUN).
+    """
+    flux_annuels = np.asarray(flux_annuels, dtype=float)
+    n, nb_annees = flux_annuels.shape
+    investissement_initial = np.broadcast_to(np.asarray(investissement_initial, dtype=float), (n,))
+    valeurs_finales = np.asarray(valeurs_finales, dtype=float)
+    actif = np.ones((n, nb_annees), dtype=bool) if actif is None else np.asarray(actif, dtype=bool)
+
+    tri = np.full((n, nb_annees), np.nan)
+    statut = np.full((n, nb_annees), TRI_AUCUN, dtype=np.int8)
+    if nb_annees == 0: return ResultatTRI(tri=tri, statut=statut)
+    changements = _changements_par_annee(investissement_initial, flux_annuels, valeurs_finales)
+    a_resoudre = actif & (changements > 0)
+
+    if n * nb_annees * (nb_annees + 1) <= TAILLE_MAX_TOUTES_ANNEES:
+        # Colonne (i, k) : -investissement, f_1, ..., f_(k-1), f_k + V_k, puis des zéros.
+        degres = np.arange(nb_annees + 1)[:, None, None]
+        coefs = np.concatenate((-investissement_initial[None, :], flux_annuels.T))[:, :, None]
+        coefs = np.where(degres < np.arange(1, nb_annees + 1), coefs, 0.0)
+        coefs[np.arange(1, nb_annees + 1), :, np.arange(nb_annees)] = (flux_annuels + valeurs_finales).T
+        coefs, colonnes = coefs.reshape(nb_annees + 1, -1), np.flatnonzero(a_resoudre)
+        tri.flat[colonnes], statut.flat[colonnes] = _resoudre(coefs, colonnes, changements.flat[colonnes], _depart_flux_regroupes(coefs[:, colonnes]))
+        return ResultatTRI(tri=tri, statut=statut)
+
+    coefs = np.empty((nb_annees + 1, n))  # ligne t : flux de l'année t
+    coefs[0] = -investissement_initial
+    v_precedent = np.full(n, 1 / 1.05)
+    for k in range(1, nb_annees + 1):
+        coefs[k] = flux_annuels[:, k - 1] + valeurs_finales[:, k - 1]
+        lignes = np.flatnonzero(a_resoudre[:, k - 1])
+        if lignes.size:
+            tri[lignes, k - 1], statut[lignes, k - 1] = _resoudre(coefs[:k + 1], lignes, changements[lignes, k - 1], v_precedent[lignes])
+            trouve = lignes[~np.isnan(tri[lignes, k - 1])]
+            v_precedent[trouve] = 1 / (1 + tri[trouve, k - 1])
+        coefs[k] = flux_annuels[:, k - 1]
+
+    return ResultatTRI(tri=tri, statut=statut)
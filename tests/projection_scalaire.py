@@ -0,0 +1,186 @@
+# tests/projection_scalaire.py
+
+from collections import defaultdict
+
+import numpy as np
+import numpy_financial as npf
+
+# --- MOTEUR SCALAIRE FIGÉ (RÉFÉRENCE DES TESTS) ---
+# Copie du calcul d'origine de app.py, une année et un scénario à la fois,
+# avant le moteur par lots de moteur.projection. Ne pas modifier : les tests
+# de non-régression comparent le moteur par lots à ce calcul.
+
+# --- MOTEUR DE CALCUL DU PRÊT ---
+def generer_tableau_amortissement(montant_pret, taux_annuel_pc, duree_annees):
+    if not (montant_pret > 0 and taux_annuel_pc > 0 and duree_annees > 0): return {}
+    taux_mensuel = (taux_annuel_pc / 100) / 12
+    nb_mois = int(duree_annees * 12)
+    try: mensualite = npf.pmt(taux_mensuel, nb_mois, -montant_pret)
+    except ZeroDivisionError: return {}
+    tableau_annuel = defaultdict(lambda: {'interet': 0, 'principal': 0, 'crd_fin_annee': 0})
+    capital_restant_du = montant_pret
+    for mois in range(1, nb_mois + 1):
+        annee = (mois - 1) // 12 + 1
+        interet_mois = capital_restant_du * taux_mensuel
+        principal_mois = mensualite - interet_mois
+        capital_restant_du -= principal_mois
+        tableau_annuel[annee]['interet'] += interet_mois; tableau_annuel[annee]['principal'] += principal_mois
+        tableau_annuel[annee]['crd_fin_annee'] = capital_restant_du if capital_restant_du > 0.01 else 0
+    return dict(tableau_annuel)
+
+# --- MOTEUR DE CALCUL IMPÔT PLUS-VALUE ---
+def calculer_impot_plus_value(plus_value_brute, duree_detention):
+    if plus_value_brute <= 0: return 0, 0, 0, 0
+    abattement_ir = 0
+    if duree_detention > 5:
+        abattement_ir += sum(0.06 for _ in range(6, min(duree_detention, 21) + 1))
+        if duree_detention >= 22: abattement_ir += 0.04
+    base_imposable_ir = plus_value_brute * (1 - abattement_ir)
+    impot_sur_revenu_pv = base_imposable_ir * 0.19
+    abattement_ps = 0
+    if duree_detention > 5:
+        abattement_ps += sum(0.0165 for _ in range(6, min(duree_detention, 21) + 1))
+        if duree_detention == 22: abattement_ps += 0.0160
+        if duree_detention > 22: abattement_ps += sum(0.09 for _ in range(23, min(duree_detention, 30) + 1))
+    base_imposable_ps = plus_value_brute * (1 - abattement_ps)
+    prelevements_sociaux_pv = base_imposable_ps * 0.172
+    impot_total_pv = max(0, impot_sur_revenu_pv) + max(0, prelevements_sociaux_pv)
+    return impot_total_pv, plus_value_brute, base_imposable_ir, base_imposable_ps
+
+
+# --- MOTEUR DE SIMULATION LMNP ---
+def generer_projection_lmnp(params):
+    try: valeurs_num = {k: float(v) for k, v in params.items()}
+    except (ValueError, TypeError): return [{"erreur": "Veuillez entrer des nombres valides."}]
+
+    # Initialisation
+    prix_achat, cout_travaux, frais_notaire = valeurs_num.get("prix_achat", 0), valeurs_num.get("cout_travaux", 0), valeurs_num.get("frais_notaire", 0)
+    apport, frais_dossier = valeurs_num.get("apport_personnel", 0), valeurs_num.get("frais_dossier", 0)
+    montant_pret = prix_achat + cout_travaux + frais_notaire - apport
+    cout_acquisition = prix_achat + cout_travaux
+    base_acquisition_pv = prix_achat + cout_travaux + frais_notaire
+    investissement_initial_personnel = apport + frais_dossier # Frais de notaire sont dans le prêt
+    duree_pret = int(valeurs_num.get("duree_pret", 0))
+
+    tableau_amortissement_pret = generer_tableau_amortissement(montant_pret, valeurs_num.get("taux_interet_pret", 0), duree_pret)
+    mensualite_assurance_base = (montant_pret * (valeurs_num.get("taux_assurance_pret", 0) / 100)) / 12
+
+    loyer_mensuel_base, charges_copro_base, taxe_fonciere_base = valeurs_num.get("loyer_mensuel", 0), valeurs_num.get("charges_copro", 0), valeurs_num.get("taxe_fonciere", 0)
+    inflation_pc, revalo_bien_pc = valeurs_num.get("inflation_pc", 0) / 100, valeurs_num.get("revalo_bien_pc", 0) / 100
+    tmi_pc, prelevements_sociaux_pc = valeurs_num.get("tmi_pc", 0) / 100, 0.172 # PS sur revenus locatifs sont fixes
+    
+    cashflow_investisseur_accumule, amortissement_cumule, deficit_reportable = 0, 0, 0
+    tresorerie_sarl_cumulee = 0
+    abondement_cumule = 0
+    flux_tresorerie_tri_annuels = []
+    projection = []
+
+    for annee in range(1, duree_pret + 1):
+        facteur_inflation = (1 + inflation_pc)**(annee - 1)
+        loyer_annuel = (loyer_mensuel_base * 12) * facteur_inflation
+        charges_copro_annuelles = (charges_copro_base * 12) * facteur_inflation
+        taxe_fonciere_actuelle = taxe_fonciere_base * facteur_inflation
+        frais_gestion_annuels = loyer_annuel * (valeurs_num.get("frais_gestion_pc", 0) / 100)
+        gli_annuelle = (loyer_annuel + charges_copro_annuelles) * (valeurs_num.get("taux_gli_pc", 0) / 100)
+        
+        charges_annuelles_cash = (charges_copro_annuelles + taxe_fonciere_actuelle +
+            valeurs_num.get("assurance_pno", 0) + frais_gestion_annuels + gli_annuelle +
+            (valeurs_num.get("cfe", 0) * facteur_inflation))
+        if annee == 1: charges_annuelles_cash += frais_dossier
+
+        interets_annuels = tableau_amortissement_pret.get(annee, {}).get('interet', 0)
+        assurance_annuelle = mensualite_assurance_base * 12
+        
+        charges_annuelles_deductibles = charges_annuelles_cash + interets_annuels + assurance_annuelle
+        
+        amort_immo = (prix_achat + frais_notaire) * 0.85 / valeurs_num.get("duree_amort_immo", 1) if annee <= valeurs_num.get("duree_amort_immo", 0) else 0
+        amort_travaux = cout_travaux / 10 if annee <= 10 else 0
+        amort_meubles = valeurs_num.get("valeur_meubles", 0) / valeurs_num.get("duree_amort_meubles", 1) if annee <= valeurs_num.get("duree_amort_meubles", 0) else 0
+        amortissement_annuel = amort_immo + amort_travaux + amort_meubles
+        amortissement_cumule += amortissement_annuel
+
+        resultat_fiscal_avant_deficit = loyer_annuel - charges_annuelles_deductibles - amortissement_annuel
+        benefice_imposable = max(0, resultat_fiscal_avant_deficit - deficit_reportable)
+        deficit_genere = abs(min(0, resultat_fiscal_avant_deficit)); deficit_consomme = min(deficit_reportable, max(0, resultat_fiscal_avant_deficit))
+        deficit_reportable = (deficit_reportable - deficit_consomme) + deficit_genere
+        impot_total_annuel = benefice_imposable * (tmi_pc + prelevements_sociaux_pc)
+        
+        principal_annuel = tableau_amortissement_pret.get(annee, {}).get('principal', 0)
+        mensualite_credit_annuelle = interets_annuels + principal_annuel + assurance_annuelle
+        cashflow_sarl_avant_operations = loyer_annuel - charges_annuelles_cash - mensualite_credit_annuelle
+        
+        tresorerie_avant_distribution = tresorerie_sarl_cumulee + cashflow_sarl_avant_operations
+        
+        abondement = 0
+        if tresorerie_avant_distribution < 0:
+            abondement = abs(tresorerie_avant_distribution)
+            abondement_cumule += abondement
+            tresorerie_sarl_cumulee = 0
+        else:
+            tresorerie_sarl_cumulee = tresorerie_avant_distribution
+            
+        taux_distrib = valeurs_num.get("taux_distrib_pc", 100) / 100
+        dividendes_disponibles = max(0, resultat_fiscal_avant_deficit)
+        dividendes_verses = min(dividendes_disponibles, tresorerie_sarl_cumulee) * taux_distrib
+        
+        tresorerie_sarl_cumulee -= dividendes_verses
+        
+        cashflow_net_investisseur_annuel = dividendes_verses - impot_total_annuel - abondement
+        cashflow_investisseur_accumule += cashflow_net_investisseur_annuel
+        flux_tresorerie_tri_annuels.append(cashflow_net_investisseur_annuel)
+
+        prix_revente = cout_acquisition * (1 + revalo_bien_pc)**annee
+        valeur_nette_comptable = base_acquisition_pv - amortissement_cumule
+        plus_value_brute = prix_revente - base_acquisition_pv
+        
+        impot_sur_pv, _, _, _ = calculer_impot_plus_value(plus_value_brute, annee)
+
+        crd = tableau_amortissement_pret.get(annee, {}).get('crd_fin_annee', 0)
+        
+        cash_net_apres_revente = prix_revente - crd - impot_sur_pv
+        cash_net_final_investisseur = cash_net_apres_revente + tresorerie_sarl_cumulee
+        
+        total_cash_investi = investissement_initial_personnel + abondement_cumule
+        total_cash_recu = cashflow_investisseur_accumule - cashflow_net_investisseur_annuel + cash_net_final_investisseur
+        benefice_net_total = total_cash_recu - total_cash_investi
+        
+        cash_flows_annuel = [-investissement_initial_personnel] + flux_tresorerie_tri_annuels[:]
+        cash_flows_annuel[-1] += cash_net_final_investisseur
+        try: 
+            tri = npf.irr(cash_flows_annuel)
+            tri_pc = tri * 100 if not np.isnan(tri) else 0
+        except: 
+            tri_pc = 0
+
+        projection.append({ "Année": annee, "Loyers Annuels": loyer_annuel, "Résultat Fiscal": resultat_fiscal_avant_deficit, "Dividendes Disponibles": dividendes_disponibles, "Impôt (IR+PS)": impot_total_annuel, "Cash-flow Net": cashflow_net_investisseur_annuel, "Tréso. SARL": tresorerie_sarl_cumulee, "PV Brute": plus_value_brute, "Impôt sur PV": impot_sur_pv, "Bénéfice Net Total": benefice_net_total, "TRI (%)": tri_pc })
+
+    # Section post-crédit
+    projection_post_credit = {}
+    if duree_pret > 0 and len(projection) > 0:
+        annee_post_credit = duree_pret + 1; facteur_inflation = (1 + inflation_pc)**(annee_post_credit - 1)
+        loyer_annuel = (loyer_mensuel_base * 12) * facteur_inflation; charges_copro_annuelles = (charges_copro_base * 12) * facteur_inflation
+        taxe_fonciere_actuelle = taxe_fonciere_base * facteur_inflation
+        frais_gestion_annuels = loyer_annuel * (valeurs_num.get("frais_gestion_pc", 0) / 100); gli_annuelle = (loyer_annuel + charges_copro_annuelles) * (valeurs_num.get("taux_gli_pc", 0) / 100)
+        charges_annuelles_cash = (charges_copro_annuelles + taxe_fonciere_actuelle + valeurs_num.get("assurance_pno", 0) + frais_gestion_annuels + gli_annuelle + (valeurs_num.get("cfe", 0) * facteur_inflation))
+        
+        amort_immo = (prix_achat + frais_notaire) * 0.85 / valeurs_num.get("duree_amort_immo", 1) if annee_post_credit <= valeurs_num.get("duree_amort_immo", 0) else 0
+        amort_travaux = cout_travaux / 10 if annee_post_credit <= 10 else 0
+        amort_meubles = valeurs_num.get("valeur_meubles", 0) / valeurs_num.get("duree_amort_meubles", 1) if annee_post_credit <= valeurs_num.get("duree_amort_meubles", 0) else 0
+        amortissement_annuel = amort_immo + amort_travaux + amort_meubles
+        resultat_fiscal = loyer_annuel - charges_annuelles_cash - amortissement_annuel
+        
+        benefice_imposable = max(0, resultat_fiscal - deficit_reportable); impot_total_annuel = benefice_imposable * (tmi_pc + prelevements_sociaux_pc)
+        cashflow_sarl_post_credit = loyer_annuel - charges_annuelles_cash
+        
+        tresorerie_post_credit = tresorerie_sarl_cumulee + cashflow_sarl_post_credit
+        
+        taux_distrib = valeurs_num.get("taux_distrib_pc", 100) / 100
+        dividendes_disponibles = max(0, resultat_fiscal)
+        dividendes_verses = min(dividendes_disponibles, tresorerie_post_credit) * taux_distrib
+        
+        cashflow_net_investisseur_annuel = dividendes_verses - impot_total_annuel
+        tresorerie_post_credit -= dividendes_verses
+        
+        projection_post_credit = {"Année": f"An {annee_post_credit}", "Loyers Annuels": loyer_annuel, "Résultat Fiscal": resultat_fiscal, "Dividendes Disponibles": dividendes_disponibles, "Impôt (IR+PS)": impot_total_annuel, "Cash-flow Net": cashflow_net_investisseur_annuel, "Tréso. SARL": tresorerie_post_credit, "PV Brute": "N/A", "Impôt sur PV": "N/A", "Bénéfice Net Total": "N/A", "TRI (%)": "N/A"}
+
+    return projection, projection_post_credit
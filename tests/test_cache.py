@@ -0,0 +1,71 @@
+# tests/test_cache.py
+
+import itertools
+import types
+
+import pytest
+
+import moteur.cache
+from moteur.cache import CacheLRU, CacheResultats, StockageSQLite, cle_parametres
+
+
+@pytest.fixture
+def horloge(monkeypatch):
+    """Horloge strictement croissante : l'ordre des accès SQLite ne dépend pas de la résolution de time.time()."""
+    monkeypatch.setattr(moteur.cache, "time", types.SimpleNamespace(time=itertools.count(1.0).__next__))
+
+
+def test_lru_evince_l_entree_la_moins_recemment_lue():
+    cache = CacheLRU(2)
+    cache.ecrire("a", 1); cache.ecrire("b", 2)
+    assert cache.lire("a") == 1
+    cache.ecrire("c", 3)
+    assert cache.lire("b") is None and cache.lire("a") == 1 and cache.lire("c") == 3
+    assert (len(cache), cache.succes, cache.echecs, cache.evictions) == (2, 3, 1, 1)
+
+
+def test_sqlite_borne_en_nombre_d_entrees(tmp_path, horloge):
+    stockage = StockageSQLite(str(tmp_path / "cache.sqlite"), taille_max=2)
+    stockage.ecrire("a", [1.0]); stockage.ecrire("b", {"x": 2})
+    assert stockage.lire("a") == [1.0]
+    stockage.ecrire("c", 3)
+    assert len(stockage) == 2 and stockage.evictions == 1
+    assert stockage.lire("b") is None and stockage.lire("a") == [1.0] and stockage.lire("c") == 3
+    stockage.fermer()
+
+
+def test_compteurs_et_persistance(tmp_path):
+    chemin, calculs = str(tmp_path / "cache.sqlite"), []
+    def calcul():
+        calculs.append(1)
+        return len(calculs)
+    cache = CacheResultats(chemin_sqlite=chemin)
+    assert cache.obtenir("pret", {"a": 1}, calcul) == 1
+    assert cache.obtenir("pret", {"a": 1}, calcul) == 1
+    assert cache.obtenir("projection", {"a": 1}, calcul) == 2
+    statistiques = cache.statistiques()
+    assert statistiques["mémoire/pret"] == {"entrees": 1, "succes": 1, "echecs": 1, "evictions": 0}
+    assert statistiques["disque"] == {"entrees": 2, "succes": 0, "echecs": 2, "evictions": 0}
+    cache.disque.fermer()
+    # Nouvelle session : lu sur disque, sans recalcul.
+    cache = CacheResultats(chemin_sqlite=chemin)
+    assert cache.obtenir("pret", {"a": 1}, calcul) == 1 and len(calculs) == 2
+    assert cache.statistiques()["disque"]["succes"] == 1
+    cache.disque.fermer()
+
+
+def test_cle_normalisee():
+    assert cle_parametres({"a": 1, "b": [1, 2]}, "pret") == cle_parametres({"b": (1.0, 2.0), "a": 1.0}, "pret")
+    assert cle_parametres({"a": 1}, "pret") != cle_parametres({"a": 1}, "projection")
+    assert cle_parametres({"a": 1}) != cle_parametres({"a": 2})
+
+
+def test_changement_de_version_invalide_le_disque(tmp_path, monkeypatch):
+    chemin = str(tmp_path / "cache.sqlite")
+    cache = CacheResultats(chemin_sqlite=chemin)
+    cache.obtenir("pret", {"a": 1}, lambda: "ancien")
+    cache.disque.fermer()
+    monkeypatch.setattr(moteur.cache, "VERSION_MOTEUR", moteur.cache.VERSION_MOTEUR + 1)
+    cache = CacheResultats(chemin_sqlite=chemin)
+    assert cache.obtenir("pret", {"a": 1}, lambda: "nouveau") == "nouveau"
+    cache.disque.fermer()
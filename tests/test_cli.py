@@ -0,0 +1,32 @@
+# tests/test_cli.py
+
+import pandas as pd
+import pytest
+
+from moteur.benchmark import PARAMETRES_REFERENCE
+from moteur.cli import main, scorer_fichier
+
+
+def ecrire_affaires(chemin, nb, absentes=(), **modifications):
+    affaires = pd.DataFrame([dict(PARAMETRES_REFERENCE, reference=f"A{i}", **modifications) for i in range(nb)])
+    affaires.drop(columns=list(absentes)).to_csv(chemin, index=False)
+
+
+def test_revente_au_dela_du_pret(tmp_path):
+    entree, sortie = tmp_path / "affaires.csv", tmp_path / "resultats.csv"
+    ecrire_affaires(entree, 3, duree_pret=25)
+    assert main([str(entree), str(sortie), "--processus", "1", "--annee", "30"]) == 0
+    resultats = pd.read_csv(sortie)
+    assert (resultats["Année de revente"] == 30).all()
+    assert list(resultats["reference"]) == ["A0", "A1", "A2"]
+
+
+def test_colonne_manquante(tmp_path):
+    entree = tmp_path / "affaires.csv"
+    ecrire_affaires(entree, 2, absentes=("loyer_mensuel", "cfe"))
+    with pytest.raises(ValueError, match="loyer_mensuel, cfe"):
+        scorer_fichier(str(entree), str(tmp_path / "resultats.csv"), nb_processus=1)
+    assert not (tmp_path / "resultats.csv").exists()
+    assert scorer_fichier(str(entree), str(tmp_path / "resultats.csv"), nb_processus=1, defauts={"loyer_mensuel": 800.0, "cfe": 0.0}) == 2
+    with pytest.raises(SystemExit):
+        main([str(entree), str(tmp_path / "resultats.csv"), "--processus", "1"])
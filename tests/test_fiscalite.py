@@ -0,0 +1,26 @@
+# tests/test_fiscalite.py
+
+import numpy as np
+import pytest
+
+from moteur.fiscalite import abattements_plus_value, calculer_impot_plus_value, impot_plus_value
+
+import projection_scalaire
+
+DUREES = list(range(-2, 41))
+
+
+def test_abattements_scalaires_identiques_au_tableau():
+    abattements_ir, abattements_ps = abattements_plus_value(np.array(DUREES))
+    for i, duree in enumerate(DUREES):
+        for valeur in (duree, float(duree) + 0.5, np.int64(duree), np.float64(duree)):
+            assert abattements_plus_value(valeur) == (abattements_ir[i], abattements_ps[i])
+
+
+@pytest.mark.parametrize("plus_value", [-1000.0, 0.0, 85000.0])
+def test_impot_scalaire_identique_au_calcul_vectorise(plus_value):
+    impots = impot_plus_value(plus_value, np.array(DUREES))
+    for i, duree in enumerate(DUREES):
+        assert calculer_impot_plus_value(plus_value, duree)[0] == pytest.approx(impots[i], rel=1e-12, abs=1e-9)
+        if 0 <= duree <= 22:  # au-delà, le calcul d'origine oublie l'abattement PS de la 22e année
+            assert calculer_impot_plus_value(plus_value, duree) == pytest.approx(projection_scalaire.calculer_impot_plus_value(plus_value, duree), rel=1e-12, abs=1e-6)
@@ -0,0 +1,30 @@
+# tests/test_monte_carlo.py
+
+import numpy as np
+import pytest
+
+from moteur.benchmark import PARAMETRES_REFERENCE
+from moteur.monte_carlo import HypothesesStochastiques, simuler_monte_carlo, tirer_trajectoires
+
+
+@pytest.mark.parametrize("ecart_type_inflation_pc", [0.0, 1.0, 4.0])
+def test_dispersion_revalo_independante_de_l_inflation(ecart_type_inflation_pc):
+    hypotheses = HypothesesStochastiques(ecart_type_inflation_pc=ecart_type_inflation_pc, ecart_type_revalo_pc=3.0, correlation_inflation_revalo=0.8)
+    trajectoires, _ = tirer_trajectoires({"inflation_pc": 2.0, "revalo_bien_pc": 1.0}, hypotheses, 100000, 5, np.random.default_rng(0))
+    np.testing.assert_allclose(trajectoires["revalo_bien_pc"].std(axis=0), 3.0, rtol=0.02)
+    if ecart_type_inflation_pc:
+        correlation = np.corrcoef(trajectoires["inflation_pc"][:, 2], trajectoires["revalo_bien_pc"][:, 2])[0, 1]
+        assert correlation == pytest.approx(0.8, abs=0.01)
+
+
+@pytest.mark.parametrize("nb_trajectoires", [0, -5])
+def test_nombre_de_trajectoires_invalide(nb_trajectoires):
+    with pytest.raises(ValueError, match="trajectoires"):
+        simuler_monte_carlo(PARAMETRES_REFERENCE, nb_trajectoires)
+
+
+def test_une_seule_trajectoire():
+    resultat = simuler_monte_carlo(PARAMETRES_REFERENCE, 1, graine=0)
+    duree_pret = int(PARAMETRES_REFERENCE["duree_pret"])
+    assert resultat.nb_trajectoires == 1 and resultat.bandes["TRI (%)"].shape == (3, duree_pret)
+    assert resultat.probabilite_abondement in (0.0, 1.0)
@@ -0,0 +1,18 @@
+# tests/test_objectifs.py
+
+import pytest
+
+from moteur.benchmark import PARAMETRES_REFERENCE
+from moteur.objectifs import OBJECTIF_ATTEINT, Objectif, resoudre_objectifs
+
+PARAMETRES = dict(PARAMETRES_REFERENCE, duree_pret=20, taux_distrib_pc=30, tmi_pc=45, duree_amort_immo=20)
+
+
+def test_objectif_independant_des_autres_horizons():
+    cashflow_min = Objectif("taux_distrib_pc", "Cash-flow Min", -500, "min", borne_max=100)
+    tri_30_ans = Objectif("taux_distrib_pc", "TRI (%)", 0.0, "max", annee=30, borne_max=100)
+    seul, = resoudre_objectifs(PARAMETRES, [cashflow_min])
+    ensemble, _ = resoudre_objectifs(PARAMETRES, [cashflow_min, tri_30_ans])
+    assert seul.statut == OBJECTIF_ATTEINT
+    assert ensemble.valeur == pytest.approx(seul.valeur, abs=cashflow_min.tolerance)
+    assert ensemble.valeur_indicateur >= cashflow_min.cible
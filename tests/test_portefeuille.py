@@ -0,0 +1,67 @@
+# tests/test_portefeuille.py
+
+import numpy as np
+import pytest
+
+from moteur.benchmark import PARAMETRES_REFERENCE
+from moteur.portefeuille import PARAMETRES_LOT, Portefeuille
+from moteur.projection import COLONNES_PROJECTION, PRELEVEMENTS_SOCIAUX_REVENUS, generer_projection_lmnp_lot
+
+from test_projection import parametres_aleatoires
+
+HORIZON = 32
+TOLERANCE_RELATIVE, TOLERANCE_ABSOLUE = 1e-13, 1e-9
+
+
+def portefeuille(params, *lots):
+    """Portefeuille aux hypothèses de société de `params`, contenant les lots `lots` (dicts de PARAMETRES_LOT)."""
+    resultat = Portefeuille(HORIZON, params["inflation_pc"], params["tmi_pc"], params["taux_distrib_pc"])
+    for lot in lots: resultat.ajouter({cle: valeur for cle, valeur in lot.items() if cle in PARAMETRES_LOT})
+    return resultat
+
+
+@pytest.mark.parametrize("params", [PARAMETRES_REFERENCE] + parametres_aleatoires(5, graine=11))
+def test_lot_unique_identique_au_mono_lot(params):
+    projection = portefeuille(params, params).projeter()
+    lot = generer_projection_lmnp_lot(params, horizon=HORIZON)
+    for colonne in COLONNES_PROJECTION:
+        np.testing.assert_allclose(projection.colonnes[colonne], lot.colonnes[colonne][0], rtol=TOLERANCE_RELATIVE, atol=TOLERANCE_ABSOLUE, err_msg=colonne)
+    np.testing.assert_array_equal(projection.statut_tri, lot.statut_tri[0])
+    np.testing.assert_allclose(projection.abondement, lot.abondement[0], rtol=TOLERANCE_RELATIVE, atol=TOLERANCE_ABSOLUE)
+
+
+def test_ajouter_puis_retirer_restaure_les_totaux():
+    params = PARAMETRES_REFERENCE
+    societe = portefeuille(params, params)
+    avant = societe.projeter()
+    identifiants = societe.ajouter({cle: [valeur[cle] for valeur in parametres_aleatoires(4, graine=2)] for cle in PARAMETRES_LOT if cle != "annee_acquisition"})
+    assert len(societe) == 5
+    societe.retirer(identifiants)
+    apres = societe.projeter()
+    assert len(societe) == 1
+    for colonne in COLONNES_PROJECTION:
+        np.testing.assert_allclose(apres.colonnes[colonne], avant.colonnes[colonne], rtol=TOLERANCE_RELATIVE, atol=TOLERANCE_ABSOLUE, err_msg=colonne)
+    with pytest.raises(KeyError): societe.flux_lot(identifiants[0])
+
+
+def test_deficit_et_tresorerie_partages_entre_lots():
+    # Lot déficitaire acquis en année 1 (prêt cher, loyer faible), lot bénéficiaire sans prêt acquis en année 4.
+    deficitaire = dict(PARAMETRES_REFERENCE, loyer_mensuel=450.0, taux_interet_pret=5.0, apport_personnel=0.0)
+    beneficiaire = dict(PARAMETRES_REFERENCE, prix_achat=90000.0, frais_notaire=7000.0, apport_personnel=97000.0, loyer_mensuel=1100.0, annee_acquisition=4)
+    ensemble = portefeuille(PARAMETRES_REFERENCE, deficitaire, beneficiaire).projeter()
+    separes = [portefeuille(PARAMETRES_REFERENCE, lot).projeter() for lot in (deficitaire, beneficiaire)]
+    np.testing.assert_array_equal(ensemble.nb_lots, 1 + (np.arange(1, HORIZON + 1) >= 4))
+
+    # Le résultat fiscal s'additionne ; l'impôt suit le déficit reportable commun aux deux lots.
+    resultats = ensemble.colonnes["Résultat Fiscal"]
+    np.testing.assert_allclose(resultats, separes[0].colonnes["Résultat Fiscal"] + separes[1].colonnes["Résultat Fiscal"], rtol=TOLERANCE_RELATIVE, atol=TOLERANCE_ABSOLUE)
+    deficit, impots = 0.0, []
+    for resultat in resultats:
+        impots.append(max(0.0, resultat - deficit) * (PARAMETRES_REFERENCE["tmi_pc"] / 100 + PRELEVEMENTS_SOCIAUX_REVENUS))
+        deficit = max(0.0, deficit - max(0.0, resultat)) + max(0.0, -resultat)
+    np.testing.assert_allclose(ensemble.colonnes["Impôt (IR+PS)"], impots, rtol=TOLERANCE_RELATIVE, atol=TOLERANCE_ABSOLUE)
+    assert ensemble.colonnes["Impôt (IR+PS)"].sum() < separes[0].colonnes["Impôt (IR+PS)"].sum() + separes[1].colonnes["Impôt (IR+PS)"].sum()
+
+    # Une seule trésorerie : les loyers du lot bénéficiaire couvrent les échéances du lot déficitaire.
+    assert separes[0].abondement[3:].sum() > 0
+    assert ensemble.abondement[3:].sum() < separes[0].abondement[3:].sum() + separes[1].abondement[3:].sum()
@@ -0,0 +1,62 @@
+# tests/test_pret.py
+
+import numpy as np
+import numpy_financial as npf
+import pytest
+
+from moteur.pret import calculer_echeanciers
+
+TOLERANCE_RELATIVE, TOLERANCE_ABSOLUE = 1e-9, 1e-6
+
+
+def echeancier_mois_par_mois(montant, taux_annuel_pc, duree_annees, differe_mois=0, differe_total=False, paliers=()):
+    """Échéancier de référence : un mois après l'autre, échéance recalculée à chaque changement de taux ou de phase."""
+    nb_mois = int(duree_annees * 12)
+    taux_par_mois = [taux_annuel_pc / 100 / 12] * nb_mois
+    for mois_debut, taux_pc in sorted(paliers):
+        taux_par_mois[mois_debut - 1:] = [taux_pc / 100 / 12] * (nb_mois - mois_debut + 1)
+    solde, echeance, lignes = float(montant), None, []
+    for mois in range(nb_mois):
+        taux = taux_par_mois[mois]
+        interet = solde * taux
+        if mois < differe_mois:
+            paye = 0.0 if differe_total else interet
+        else:
+            if echeance is None or mois == differe_mois or taux != taux_par_mois[mois - 1]:
+                echeance = -npf.pmt(taux, nb_mois - mois, solde) if taux else solde / (nb_mois - mois)
+            paye = echeance
+        solde -= paye - interet
+        lignes.append((interet, paye - interet, solde, paye))
+    return np.array(lignes).T
+
+
+@pytest.mark.parametrize("options", [
+    dict(),
+    dict(differe_mois=18),
+    dict(differe_mois=12, differe_total=True),
+    dict(paliers=((25, 2.0), (61, 5.5))),
+    dict(differe_mois=6, paliers=((13, 0.0), (100, 3.0))),
+], ids=["simple", "differe_partiel", "differe_total", "deux_paliers", "differe_et_paliers"])
+def test_echeancier_identique_au_calcul_mensuel(options):
+    echeancier = calculer_echeanciers(180000.0, 3.7, 15, **options)
+    interet, principal, crd, mensualite = echeancier_mois_par_mois(180000.0, 3.7, 15, **options)
+    for obtenu, attendu in [(echeancier.interet, interet), (echeancier.principal, principal), (echeancier.crd, crd), (echeancier.mensualite, mensualite)]:
+        np.testing.assert_allclose(obtenu[0], attendu, rtol=TOLERANCE_RELATIVE, atol=TOLERANCE_ABSOLUE)
+    assert abs(echeancier.crd[0, -1]) < TOLERANCE_ABSOLUE
+    if options.get("differe_total"):
+        assert (echeancier.principal[0, :options["differe_mois"]] < 0).all()
+
+
+def test_lot_identique_aux_prets_isoles():
+    generateur = np.random.default_rng(0)
+    montants, taux, durees = generateur.uniform(20000, 400000, 25), generateur.choice([0.0, 1.2, 4.5], 25), generateur.integers(1, 31, 25)
+    differes = np.where(generateur.random(25) < 0.5, np.minimum(durees * 12 - 1, 24), 0)
+    paliers = ((37, 3.0), (121, 1.5))
+    for differe_total in (False, True):
+        lot = calculer_echeanciers(montants, taux, durees, differes, differe_total, paliers)
+        for i in range(25):
+            seul = calculer_echeanciers(montants[i], taux[i], durees[i], differes[i], differe_total, paliers)
+            nb_colonnes = seul.interet.shape[1]
+            for champ in ("interet", "principal", "crd", "mensualite"):
+                np.testing.assert_allclose(getattr(lot, champ)[i, :nb_colonnes], getattr(seul, champ)[0], rtol=TOLERANCE_RELATIVE, atol=TOLERANCE_ABSOLUE, err_msg=champ)
+                assert not getattr(lot, champ)[i, nb_colonnes:].any()
@@ -0,0 +1,86 @@
+# tests/test_projection.py
+
+import numpy as np
+import pytest
+
+from moteur.benchmark import JEUX_PARAMETRES, PARAMETRES_REFERENCE
+from moteur.projection import COLONNES_POST_CREDIT, COLONNES_PROJECTION, generer_projection_lmnp, generer_projection_lmnp_lot, indicateurs_projection
+from moteur.tri import TRI_OK
+
+import projection_scalaire
+
+# --- NON-RÉGRESSION DU MOTEUR PAR LOTS CONTRE LE CALCUL SCALAIRE D'ORIGINE ---
+# Écarts connus et voulus, exclus des comparaisons :
+# - au-delà de 22 ans de détention, le calcul d'origine oublie l'abattement PS
+#   de la 22e année : les colonnes qui dépendent de l'impôt sur la plus-value
+#   ne sont comparées que sur les 22 premières années, les autres sur toute la
+#   durée du prêt ;
+# - le calcul d'origine note 0 un TRI inexistant ou non calculable : le TRI
+#   n'est comparé que là où le moteur le trouve unique (TRI_OK).
+
+DUREE_PRET_MAX = 30
+DUREE_COMPAREE_PLUS_VALUE = 22
+COLONNES_PLUS_VALUE = ("Impôt sur PV", "Bénéfice Net Total", "TRI (%)")
+TOLERANCE_RELATIVE, TOLERANCE_ABSOLUE = 1e-9, 1e-6
+
+
+def parametres_aleatoires(nb, graine=0):
+    """`nb` jeux de paramètres tirés autour de PARAMETRES_REFERENCE, prêts de 1 à DUREE_PRET_MAX ans."""
+    generateur = np.random.default_rng(graine)
+    jeux = []
+    for _ in range(nb):
+        params = dict(PARAMETRES_REFERENCE)
+        params.update(prix_achat=generateur.uniform(60000, 400000), cout_travaux=generateur.choice([0.0, generateur.uniform(0, 80000)]),
+                      loyer_mensuel=generateur.uniform(300, 2500), apport_personnel=generateur.uniform(0, 150000),
+                      duree_pret=int(generateur.integers(1, DUREE_PRET_MAX + 1)), taux_interet_pret=generateur.uniform(0.5, 6),
+                      frais_dossier=generateur.choice([0.0, 1500.0]), tmi_pc=generateur.choice([0.0, 11.0, 30.0, 41.0, 45.0]),
+                      duree_amort_immo=int(generateur.integers(15, 40)), taux_distrib_pc=generateur.uniform(0, 100),
+                      inflation_pc=generateur.uniform(-1, 5), revalo_bien_pc=generateur.uniform(-3, 5), charges_copro=generateur.uniform(0, 400))
+        jeux.append(params)
+    return jeux
+
+
+def comparer_scenario(params, projection, projection_post_credit, statut_tri):
+    reference, reference_post_credit = projection_scalaire.generer_projection_lmnp(params)
+    assert len(projection) == len(reference)
+    for colonne in COLONNES_PROJECTION:
+        obtenu, attendu = np.array([ligne[colonne] for ligne in projection]), np.array([ligne[colonne] for ligne in reference])
+        if colonne == "TRI (%)": obtenu, attendu = np.where(statut_tri == TRI_OK, obtenu, np.nan), np.where(statut_tri == TRI_OK, attendu, np.nan)
+        if colonne in COLONNES_PLUS_VALUE: obtenu, attendu = obtenu[:DUREE_COMPAREE_PLUS_VALUE], attendu[:DUREE_COMPAREE_PLUS_VALUE]
+        np.testing.assert_allclose(obtenu, attendu, rtol=TOLERANCE_RELATIVE, atol=TOLERANCE_ABSOLUE, err_msg=colonne)
+    assert projection_post_credit.keys() == reference_post_credit.keys()
+    for colonne in COLONNES_POST_CREDIT:
+        np.testing.assert_allclose(projection_post_credit[colonne], reference_post_credit[colonne], rtol=TOLERANCE_RELATIVE, atol=TOLERANCE_ABSOLUE, err_msg=colonne)
+
+
+@pytest.mark.parametrize("nom_jeu", list(JEUX_PARAMETRES))
+def test_scenario_identique_au_calcul_scalaire(nom_jeu):
+    params = JEUX_PARAMETRES[nom_jeu]
+    projection, projection_post_credit = generer_projection_lmnp(params)
+    statut_tri = generer_projection_lmnp_lot(params).statut_tri[0]
+    comparer_scenario(params, projection, projection_post_credit, statut_tri)
+
+
+@pytest.mark.parametrize("nb_scenarios", [1, 3, 40])
+def test_lot_identique_au_calcul_scalaire(nb_scenarios):
+    jeux = parametres_aleatoires(nb_scenarios, graine=nb_scenarios)
+    lot = generer_projection_lmnp_lot({cle: [params[cle] for params in jeux] for cle in PARAMETRES_REFERENCE})
+    for i, params in enumerate(jeux):
+        comparer_scenario(params, *lot.scenario(i), lot.statut_tri[i, :int(params["duree_pret"])])
+
+
+@pytest.mark.parametrize("annee", [None, 1, 12, 30])
+def test_indicateurs_limites_a_l_annee_de_revente(annee):
+    jeux = parametres_aleatoires(6, graine=7)
+    lot = generer_projection_lmnp_lot({cle: [params[cle] for params in jeux] for cle in PARAMETRES_REFERENCE}, horizon=35)
+    indicateurs = indicateurs_projection(lot, annee)
+    for i, params in enumerate(jeux):
+        detention = int(params["duree_pret"]) if annee is None else annee
+        cashflows, abondements = lot.colonnes["Cash-flow Net"][i, :detention], lot.abondement[i, :detention]
+        assert indicateurs["Cash-flow Min"][i] == pytest.approx(cashflows.min(), rel=TOLERANCE_RELATIVE)
+        assert indicateurs["Cash-flow Cumulé"][i] == pytest.approx(cashflows.sum(), rel=TOLERANCE_RELATIVE)
+        assert indicateurs["Abondement Total"][i] == pytest.approx(abondements.sum(), rel=TOLERANCE_RELATIVE)
+
+
+def test_parametres_invalides():
+    assert generer_projection_lmnp(dict(PARAMETRES_REFERENCE, prix_achat="abc")) == [{"erreur": "Veuillez entrer des nombres valides."}]
@@ -0,0 +1,60 @@
+# tests/test_tri.py
+
+import numpy as np
+import numpy_financial as npf
+import pytest
+
+import moteur.tri
+from moteur.tri import TRI_AUCUN, TRI_MULTIPLE, TRI_NON_CONVERGE, TRI_OK, tri_sortie_annuelle
+
+TOLERANCE = 1e-9
+
+
+def test_aucun_changement_de_signe():
+    resultat = tri_sortie_annuelle([100.0], [[-10.0, -10.0]], [[-5.0, -5.0]])
+    assert (resultat.statut == TRI_AUCUN).all()
+    assert np.isnan(resultat.tri).all()
+
+
+def test_deux_tri():
+    # Année 2 : -100, 230, -132 = -100 (1 - 1.1 v) (1 - 1.2 v) : TRI de 10 % et 20 %.
+    resultat = tri_sortie_annuelle([100.0], [[230.0, 0.0]], [[0.0, -132.0]])
+    assert resultat.statut[0, 0] == TRI_OK and resultat.tri[0, 0] == pytest.approx(1.3, abs=TOLERANCE)
+    assert resultat.statut[0, 1] == TRI_MULTIPLE and resultat.tri[0, 1] == pytest.approx(0.1, abs=TOLERANCE)
+
+
+def test_tri_unique_malgre_plusieurs_changements_de_signe():
+    # Année 3 : -100, 50, -10, 80 change trois fois de signe, mais les sommes
+    # cumulées (-100, -50, -60, 20 et 80, 70, 120, 20) n'admettent qu'une racine.
+    resultat = tri_sortie_annuelle([100.0], [[50.0, -10.0, 0.0]], [[0.0, 0.0, 80.0]])
+    assert resultat.statut[0, 2] == TRI_OK
+    assert resultat.tri[0, 2] == pytest.approx(npf.irr([-100.0, 50.0, -10.0, 80.0]), abs=TOLERANCE)
+
+
+def test_newton_en_echec(monkeypatch):
+    flux, valeurs = [[30.0, 30.0, 30.0]], [[0.0, 0.0, 90.0]]
+    monkeypatch.setattr(moteur.tri, "ITERATIONS_MAX", 0)
+    resultat = tri_sortie_annuelle([100.0], flux, valeurs)  # repli sur les racines du polynôme
+    assert resultat.statut[0, 2] == TRI_OK
+    assert resultat.tri[0, 2] == pytest.approx(npf.irr([-100.0, 30.0, 30.0, 120.0]), abs=TOLERANCE)
+    monkeypatch.setattr(moteur.tri, "_racines_positives", lambda coefs: np.empty(0))
+    resultat = tri_sortie_annuelle([100.0], flux, valeurs)
+    assert (resultat.statut == TRI_NON_CONVERGE).all()
+    assert np.isnan(resultat.tri).all()
+
+
+@pytest.mark.parametrize("toutes_annees", [True, False], ids=["toutes_annees", "annee_par_annee"])
+def test_identique_a_npf_irr(monkeypatch, toutes_annees):
+    if not toutes_annees: monkeypatch.setattr(moteur.tri, "TAILLE_MAX_TOUTES_ANNEES", 0)
+    generateur = np.random.default_rng(3)
+    n, nb_annees = 30, 12
+    investissement = generateur.uniform(10000, 100000, n)
+    flux = generateur.normal(2000, 4000, (n, nb_annees))
+    valeurs = generateur.uniform(-20000, 120000, (n, nb_annees))
+    resultat = tri_sortie_annuelle(investissement, flux, valeurs)
+    assert (resultat.statut == TRI_OK).mean() > 0.5
+    for i in range(n):
+        for k in range(nb_annees):
+            attendu = npf.irr(np.concatenate(([-investissement[i]], flux[i, :k], [flux[i, k] + valeurs[i, k]])))
+            if resultat.statut[i, k] == TRI_AUCUN: assert np.isnan(attendu)
+            else: assert resultat.tri[i, k] == pytest.approx(attendu, rel=1e-7, abs=1e-10)